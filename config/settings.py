@@ -1,4 +1,5 @@
 import os
+import re
 from dotenv import load_dotenv
 
 load_dotenv()
@@ -15,20 +16,21 @@ MODELS = {
     "topic_modeling": "sentence-transformers/all-MiniLM-L6-v2"
 }
 
-# Activity Categories
+# Activity Categories (tuples: immutable, shared by every consumer
+# instead of risking a fresh list per lookup)
 ACTIVITY_LABELS = {
-    "daily_routine": [
+    "daily_routine": (
         "Sleep", "Wake up", "Morning routine", "Breakfast", "Commuting",
         "Work", "Lunch", "Exercise", "Dinner", "Evening routine"
-    ],
-    "life_events": [
+    ),
+    "life_events": (
         "Job change", "Travel", "Vacation", "Moving", "Relationship",
         "Education", "Health", "Family events", "Social gathering"
-    ],
-    "general_activities": [
-        "Work", "Travel", "Shopping", "Socializing", "Studying", 
+    ),
+    "general_activities": (
+        "Work", "Travel", "Shopping", "Socializing", "Studying",
         "Entertainment", "Exercise", "Eating", "Sleeping"
-    ]
+    )
 }
 
 # Time zone detection keywords
@@ -41,7 +43,20 @@ TIMEZONE_KEYWORDS = {
     "IST": ["india", "mumbai", "delhi", "ist"]
 }
 
+# Single-alternation pattern over all timezone keywords: one regex scan
+# per text with the matching zone available as the group name, instead
+# of one substring search per keyword
+TIMEZONE_REGEX = re.compile(
+    '|'.join(
+        f"(?P<{tz}>" + '|'.join(map(re.escape, keywords)) + ")"
+        for tz, keywords in TIMEZONE_KEYWORDS.items()
+    ),
+    re.IGNORECASE
+)
+
 # Data processing settings
 MAX_TEXT_LENGTH = 512
 CONFIDENCE_THRESHOLD = 0.5
-BATCH_SIZE = 10
\ No newline at end of file
+# Inputs per zero-shot request: one HTTPS round-trip amortizes TLS,
+# model warmup and tokenization across the whole chunk
+BATCH_SIZE = 32
\ No newline at end of file
@@ -1,44 +1,112 @@
 import requests
 import time
+import json
+import hashlib
+import sqlite3
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from typing import Dict, List, Any, Optional
-from config.settings import HUGGINGFACE_API_TOKEN, MODELS
+from config.settings import HUGGINGFACE_API_TOKEN, MODELS, BATCH_SIZE
+
+# Local response cache: even with HF's server-side cache a hit still
+# pays a full HTTPS round-trip, a local lookup returns in microseconds
+CACHE_PATH = "hf_cache.db"
+CACHE_TTL_SECONDS = 24 * 60 * 60
 
 class HuggingFaceClient:
     def __init__(self):
         self.api_token = HUGGINGFACE_API_TOKEN
-        self.headers = {"Authorization": f"Bearer {self.api_token}"}
+        # X-use-cache lets HF serve identical requests from its
+        # server-side inference cache instead of recomputing
+        self.headers = {
+            "Authorization": f"Bearer {self.api_token}",
+            "X-use-cache": "true"
+        }
         self.base_url = "https://api-inference.huggingface.co/models/"
-    
-    def query_model(self, model_name: str, payload: Dict[str, Any], max_retries: int = 3) -> Optional[Dict]:
-        """Query a Hugging Face model with retry logic"""
+        # Keep-alive session: every bare requests.post pays a fresh
+        # TCP+TLS handshake, a pooled connection is reused across calls.
+        # urllib3's Retry also covers the loading/rate-limit statuses
+        # (and honors Retry-After on 429/503).
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount("https://", HTTPAdapter(
+            pool_connections=8,
+            pool_maxsize=16,
+            max_retries=Retry(total=3, backoff_factor=1,
+                              status_forcelist=[429, 502, 503, 504],
+                              allowed_methods=["POST"])
+        ))
+        self._cache = sqlite3.connect(CACHE_PATH, check_same_thread=False)
+        self._cache.execute(
+            "CREATE TABLE IF NOT EXISTS kv (key TEXT PRIMARY KEY, value TEXT, ts INTEGER)"
+        )
+        self._cache.commit()
+
+    def _cache_key(self, model_name: str, payload: Dict[str, Any]) -> str:
+        """Content-addressed key for a (model, payload) pair"""
+        canonical = model_name + json.dumps(payload, sort_keys=True, default=str)
+        return hashlib.sha256(canonical.encode()).hexdigest()
+
+    def _cache_get(self, key: str) -> Optional[Dict]:
+        """Return the cached response for key, or None if missing/expired"""
+        row = self._cache.execute("SELECT value, ts FROM kv WHERE key = ?", (key,)).fetchone()
+        if row is None:
+            return None
+        value, ts = row
+        if time.time() - ts > CACHE_TTL_SECONDS:
+            return None
+        return json.loads(value)
+
+    def _cache_put(self, key: str, value: Dict) -> None:
+        """Store a successful response in the local cache"""
+        self._cache.execute(
+            "INSERT OR REPLACE INTO kv (key, value, ts) VALUES (?, ?, ?)",
+            (key, json.dumps(value), int(time.time()))
+        )
+        self._cache.commit()
+
+    def query_model(self, model_name: str, payload: Dict[str, Any],
+                    use_cache: bool = True) -> Optional[Dict]:
+        """Query a Hugging Face model with retry logic
+
+        Args:
+            model_name: Model identifier on the Hugging Face hub
+            payload: JSON payload for the inference endpoint
+            use_cache: Set False to bypass the local and server-side caches
+        """
         url = f"{self.base_url}{model_name}"
-        
-        for attempt in range(max_retries):
-            try:
-                response = requests.post(url, headers=self.headers, json=payload, timeout=30)
-                
-                if response.status_code == 200:
-                    return response.json()
-                elif response.status_code == 503:
-                    # Model is loading, wait and retry
-                    time.sleep(10)
-                    continue
-                else:
-                    print(f"API Error {response.status_code}: {response.text}")
-                    return None
-                    
-            except requests.exceptions.RequestException as e:
-                print(f"Request failed (attempt {attempt + 1}): {e}")
-                if attempt < max_retries - 1:
-                    time.sleep(5)
-        
+        headers = {} if use_cache else {"X-use-cache": "false"}
+
+        cache_key = self._cache_key(model_name, payload)
+        if use_cache:
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+
+        # Waiting for the model server-side avoids the 503 sleep/retry path
+        payload = {**payload, "options": {"wait_for_model": True, **payload.get("options", {})}}
+
+        try:
+            response = self.session.post(url, headers=headers, json=payload, timeout=30)
+        except requests.exceptions.RequestException as e:
+            print(f"Request failed: {e}")
+            return None
+
+        if response.status_code == 200:
+            result = response.json()
+            self._cache_put(cache_key, result)
+            return result
+
+        print(f"API Error {response.status_code}: {response.text}")
         return None
     
     def classify_activity(self, text: str, candidate_labels: List[str]) -> Optional[Dict]:
         """Classify text into activity categories"""
         payload = {
             "inputs": text,
-            "parameters": {"candidate_labels": candidate_labels}
+            "parameters": {"candidate_labels": candidate_labels, "multi_label": False}
         }
         return self.query_model(MODELS["activity_classification"], payload)
     
@@ -59,11 +127,97 @@ class HuggingFaceClient:
         }
         return self.query_model(MODELS["time_extraction"], payload)
     
-    def batch_classify(self, texts: List[str], candidate_labels: List[str]) -> List[Optional[Dict]]:
-        """Batch classify multiple texts"""
-        results = []
-        for text in texts:
-            result = self.classify_activity(text, candidate_labels)
-            results.append(result)
-            time.sleep(0.5)  # Rate limiting
-        return results
\ No newline at end of file
+    def batch_classify(self, texts: List[str], candidate_labels: List[str],
+                       max_workers: int = 4) -> List[Optional[Dict]]:
+        """Batch classify multiple texts
+
+        Texts are sent in chunks of BATCH_SIZE per request (the zero-shot
+        endpoint accepts a list of inputs) and independent chunks run on a
+        small thread pool, instead of one request plus a fixed sleep per
+        text. Rate limiting is handled by the 429 backoff in query_model.
+        """
+        if not texts:
+            return []
+
+        chunks = [texts[i:i + BATCH_SIZE] for i in range(0, len(texts), BATCH_SIZE)]
+
+        def classify_chunk(chunk: List[str]) -> List[Optional[Dict]]:
+            payload = {
+                "inputs": chunk,
+                # Labels are mutually exclusive here; a single softmax
+                # over the labels is one entailment pass cheaper than
+                # the independent-sigmoid default
+                "parameters": {"candidate_labels": candidate_labels, "multi_label": False}
+            }
+            result = self.query_model(MODELS["activity_classification"], payload)
+            if result is None:
+                return [None] * len(chunk)
+            if isinstance(result, dict):
+                # Single-input requests come back as a bare dict
+                result = [result]
+            return result
+
+        with ThreadPoolExecutor(max_workers=max_workers) as executor:
+            chunk_results = executor.map(classify_chunk, chunks)
+            return [result for chunk in chunk_results for result in chunk]
+
+    async def classify_batch_async(self, texts: List[str], candidate_labels: List[str],
+                                   concurrency: int = 16) -> List[Optional[Dict]]:
+        """Classify texts concurrently over async HTTP
+
+        One POST per text, issued through aiohttp with at most
+        `concurrency` requests in flight, so network latency overlaps
+        across calls instead of accumulating serially. The local cache
+        is consulted and populated exactly as in query_model.
+        """
+        # Deferred import: aiohttp is only needed for the async path
+        import aiohttp
+
+        model_name = MODELS["activity_classification"]
+        url = f"{self.base_url}{model_name}"
+        semaphore = asyncio.Semaphore(concurrency)
+
+        async def classify_one(session: "aiohttp.ClientSession", text: str) -> Optional[Dict]:
+            payload = {
+                "inputs": text,
+                "parameters": {"candidate_labels": candidate_labels, "multi_label": False}
+            }
+            cache_key = self._cache_key(model_name, payload)
+            cached = self._cache_get(cache_key)
+            if cached is not None:
+                return cached
+            async with semaphore:
+                try:
+                    async with session.post(
+                        url,
+                        json={**payload, "options": {"wait_for_model": True}},
+                        timeout=aiohttp.ClientTimeout(total=30)
+                    ) as response:
+                        if response.status == 200:
+                            result = await response.json()
+                            self._cache_put(cache_key, result)
+                            return result
+                        print(f"API Error {response.status}: {await response.text()}")
+                        return None
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    print(f"Request failed: {e}")
+                    return None
+
+        async with aiohttp.ClientSession(headers=self.headers) as session:
+            return list(await asyncio.gather(
+                *(classify_one(session, text) for text in texts)))
+
+    def classify_batch_concurrent(self, texts: List[str], candidate_labels: List[str],
+                                  concurrency: int = 16) -> List[Optional[Dict]]:
+        """Synchronous entry point for classify_batch_async
+
+        Falls back to the thread-pooled batch_classify when aiohttp is
+        not installed.
+        """
+        if not texts:
+            return []
+        try:
+            import aiohttp  # noqa: F401
+        except ImportError:
+            return self.batch_classify(texts, candidate_labels)
+        return asyncio.run(self.classify_batch_async(texts, candidate_labels, concurrency))
\ No newline at end of file
@@ -22,36 +22,54 @@ class SocialMediaClient:
         self.api = None
     
     def connect(self) -> None:
-        """Establish connection to the Twitter/X API"""
+        """Establish connection to the Twitter/X API
+
+        The v2 Client keeps an internal requests session, so reusing one
+        instance across calls reuses its keep-alive connection pool.
+        """
         try:
-            auth = tweepy.OAuthHandler(self.api_key, self.api_secret)
-            auth.set_access_token(self.access_token, self.access_token_secret)
-            self.api = tweepy.API(auth, wait_on_rate_limit=True)
+            self.api = tweepy.Client(
+                consumer_key=self.api_key,
+                consumer_secret=self.api_secret,
+                access_token=self.access_token,
+                access_token_secret=self.access_token_secret,
+                wait_on_rate_limit=True
+            )
         except Exception as e:
             raise ConnectionError(f"Failed to connect to social media API: {str(e)}")
-    
+
     def fetch_user_posts(self, username: str, max_posts: int = 100) -> List[Dict]:
         """
         Fetch posts from a specific user
-        
+
+        Uses the v2 timeline endpoint paginated at 100 tweets per page
+        (v1.1 returned 20), cutting round-trips ~5x on large timelines.
+
         Args:
             username: Social media username
             max_posts: Maximum number of posts to fetch
-        
+
         Returns:
             List of dictionaries containing post data
         """
         if not self.api:
             self.connect()
-        
+
         try:
+            user_id = self.api.get_user(username=username).data.id
+
             posts = []
-            for tweet in tweepy.Cursor(self.api.user_timeline, screen_name=username, tweet_mode="extended").items(max_posts):
+            for tweet in tweepy.Paginator(
+                self.api.get_users_tweets,
+                id=user_id,
+                max_results=100,
+                tweet_fields=["created_at"]
+            ).flatten(limit=max_posts):
                 posts.append({
                     "timestamp": tweet.created_at,
-                    "text": tweet.full_text,
+                    "text": tweet.text,
                     "source": "Twitter",
-                    "post_id": tweet.id_str
+                    "post_id": str(tweet.id)
                 })
             return posts
         except Exception as e:
@@ -1,9 +1,15 @@
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_datetime64_any_dtype
 from typing import Dict, List, Tuple, Optional
 from datetime import datetime, timedelta
 from collections import Counter
 
+try:
+    import numexpr as ne  # optional: fuses ufunc chains into one pass
+except ImportError:
+    ne = None
+
 class PatternAnalyzer:
     def __init__(self):
         self.daily_patterns = {}
@@ -14,49 +20,55 @@ class PatternAnalyzer:
         """Analyze daily routine patterns"""
         if data.empty or 'datetime' not in data.columns:
             return {}
-        
-        # Debug information
-        print(f"Input data shape: {data.shape}")
-        print(f"Input data columns: {data.columns.tolist()}")
-        
-        # Work with a copy to avoid modifying original
-        data = data.copy()
-        
-        # Fix duplicate columns by keeping only the first occurrence
-        data = data.loc[:, ~data.columns.duplicated()]
-        print(f"After removing duplicates: {data.columns.tolist()}")
-        
-        # Ensure datetime column is properly formatted
-        data['datetime'] = pd.to_datetime(data['datetime'])
-        data['hour'] = data['datetime'].dt.hour
-        data['date'] = data['datetime'].dt.date
-        
+
+        # Fix duplicate columns by keeping only the first occurrence;
+        # only pay for the slice when duplicates actually exist, and
+        # derive hour/date as locals rather than copying the whole frame
+        dup_mask = data.columns.duplicated()
+        if dup_mask.any():
+            data = data.loc[:, ~dup_mask]
+
+        # Ensure datetime column is properly formatted (no-op when the
+        # preprocessor already delivered a datetime64 column)
+        datetimes = data['datetime']
+        if not is_datetime64_any_dtype(datetimes):
+            datetimes = pd.to_datetime(datetimes)
+        hours = datetimes.dt.hour
+        dates = datetimes.dt.normalize()
+
         patterns = {}
-        
-        # Analyze wake-up time (first activity of the day)
-        daily_first_activity = data.groupby('date')['hour'].min()
+
+        # One grouping pass covers both wake-up (first activity) and
+        # sleep (last activity) instead of two separate groupbys
+        daily_hours = hours.groupby(dates, sort=False).agg(['min', 'max'])
+        daily_first_activity = daily_hours['min']
+        daily_last_activity = daily_hours['max']
+
         patterns['wake_up_time'] = {
             'average': daily_first_activity.mean(),
             'std': daily_first_activity.std(),
-            'most_common': daily_first_activity.mode().iloc[0] if not daily_first_activity.empty else None
+            'most_common': daily_first_activity.value_counts().index[0] if not daily_first_activity.empty else None
         }
-        
-        # Analyze sleep time (last activity of the day) 
-        daily_last_activity = data.groupby('date')['hour'].max()
+
         patterns['sleep_time'] = {
             'average': daily_last_activity.mean(),
             'std': daily_last_activity.std(),
-            'most_common': daily_last_activity.mode().iloc[0] if not daily_last_activity.empty else None
+            'most_common': daily_last_activity.value_counts().index[0] if not daily_last_activity.empty else None
         }
-        
-        # Activity frequency by hour
-        hourly_activity = data.groupby('hour').size()
-        patterns['hourly_activity'] = hourly_activity.to_dict()
-        
-        # Most active hours
-        patterns['peak_hours'] = hourly_activity.nlargest(3).index.tolist()
-        patterns['quiet_hours'] = hourly_activity.nsmallest(3).index.tolist()
-        
+
+        # Activity frequency by hour: bincount is a single O(N) pass.
+        # NaT timestamps (the preprocessor's coerce fallback) surface
+        # as NaN hours; drop them before the integer cast, matching the
+        # silent drop the old groupby did
+        hour_counts = np.bincount(hours.dropna().astype(int).to_numpy(), minlength=24)
+        observed_hours = np.nonzero(hour_counts)[0]
+        patterns['hourly_activity'] = {int(hour): int(hour_counts[hour]) for hour in observed_hours}
+
+        # Most/least active hours among those with any activity
+        by_count = observed_hours[np.argsort(hour_counts[observed_hours], kind='stable')]
+        patterns['peak_hours'] = [int(h) for h in by_count[::-1][:3]]
+        patterns['quiet_hours'] = [int(h) for h in by_count[:3]]
+
         return patterns
 
     def detect_life_events(self, data: pd.DataFrame) -> List[Dict]:
@@ -72,23 +84,37 @@ class PatternAnalyzer:
         
         data['date'] = data['datetime'].dt.date
         
-        # Detect activity volume changes
+        # Detect activity volume changes: compute the anomaly mask in one
+        # vectorized pass (std is hoisted out instead of recomputed per day)
         daily_counts = data.groupby('date').size()
         rolling_avg = daily_counts.rolling(window=7, center=True).mean()
-        
-        for date, count in daily_counts.items():
-            expected = rolling_avg.get(date, count)
-            if pd.notna(expected) and abs(count - expected) > 2 * daily_counts.std():
-                event_type = "high_activity" if count > expected else "low_activity"
-                
-                events.append({
-                    'date': date,
-                    'type': event_type,
-                    'description': f"Unusual {event_type.replace('_', ' ')} detected",
-                    'confidence': min(abs(count - expected) / daily_counts.std() / 3, 1.0),
-                    'activity_count': count,
-                    'expected_count': expected
-                })
+        std = daily_counts.std()
+
+        counts = daily_counts.to_numpy(dtype=np.float64)
+        expected_counts = rolling_avg.to_numpy(dtype=np.float64)
+        if ne is not None:
+            # Fused abs/sub pass without the pandas intermediates
+            deviation = ne.evaluate("abs(counts - expected_counts)")
+        else:
+            deviation = np.abs(counts - expected_counts)
+        anomalies = deviation > 2 * std  # NaN edges compare False
+
+        confidences = np.minimum(deviation[anomalies] / std / 3, 1.0)
+        for date, count, expected, confidence in zip(
+            daily_counts.index[anomalies],
+            counts[anomalies],
+            expected_counts[anomalies],
+            confidences,
+        ):
+            event_type = "high_activity" if count > expected else "low_activity"
+            events.append({
+                'date': date,
+                'type': event_type,
+                'description': f"Unusual {event_type.replace('_', ' ')} detected",
+                'confidence': confidence,
+                'activity_count': int(count),
+                'expected_count': expected
+            })
         
         # Detect travel patterns if travel activity exists
         if 'predicted_activity' in data.columns:
@@ -136,35 +162,22 @@ class PatternAnalyzer:
         travel_data = data[data['predicted_activity'] == 'Travel']
         if travel_data.empty:
             return events
-        
-        travel_data = travel_data.sort_values('datetime')
-        travel_data['date'] = travel_data['datetime'].dt.date
-        
-        # Group consecutive travel days
-        dates = sorted(travel_data['date'].unique())
-        travel_periods = []
-        current_period = []
-        
-        for i, date in enumerate(dates):
-            if not current_period or (date - current_period[-1]).days <= 1:
-                current_period.append(date)
-            else:
-                if len(current_period) >= 1:
-                    travel_periods.append(current_period)
-                current_period = [date]
-        
-        if current_period:
-            travel_periods.append(current_period)
-        
+
+        # Group consecutive travel days: np.unique sorts the days, and a
+        # gap of more than one day starts a new period
+        travel_days = np.unique(travel_data['datetime'].to_numpy().astype('datetime64[D]'))
+        period_starts = np.nonzero(np.diff(travel_days).astype(int) > 1)[0] + 1
+        travel_periods = np.split(travel_days, period_starts)
+
         # Create events for multi-day travel
         for period in travel_periods:
             if len(period) >= 2:
                 events.append({
-                    'date': period[0],
-                    'type': 'travel_period', 
+                    'date': period[0].astype(object),
+                    'type': 'travel_period',
                     'description': f"{len(period)}-day travel period",
                     'confidence': 0.8,
                     'duration_days': len(period)
                 })
-        
+
         return events
\ No newline at end of file
@@ -1,21 +1,79 @@
 # src/data/preprocessor.py
 import pandas as pd
 import re
+from pandas.api.types import is_datetime64_any_dtype
 from typing import Dict, List, Optional
 from datetime import datetime
+from config.settings import TIMEZONE_KEYWORDS, TIMEZONE_REGEX
+
+try:
+    import ahocorasick  # pyahocorasick; optional C-speed keyword matcher
+except ImportError:
+    ahocorasick = None
+
+try:
+    import pyarrow  # noqa: F401
+    # Arrow-backed strings: contiguous UTF-8 buffers instead of one
+    # Python object per row; .str ops run in Arrow's C++ kernels
+    _TEXT_DTYPE = 'string[pyarrow]'
+except ImportError:
+    _TEXT_DTYPE = 'string'
+
+# Compiled once at import so the vectorized cleaning path pays no
+# per-row pattern compilation cost
+_EMAIL_RE = re.compile(r'\S+@\S+')
+_URL_RE = re.compile(r'http\S+|www\S+')
+_KEEP_RE = re.compile(r'[^\w\s.:!?@#$%&*()+=\-\[\]{};\'",<>/|\\`~_^]')
+_WS_RE = re.compile(r'\s+')
+
+# Low-cardinality columns stored as int8 codes + a small category table
+# instead of one Python string per row; groupby/value_counts then hash
+# integers rather than strings
+def _parse_timestamps(series: pd.Series) -> pd.Series:
+    """Convert a timestamp column to datetime via the fast paths
+
+    Already-datetime columns pass through untouched; ISO8601 input (the
+    IMAP/tweepy/export formats) uses pandas' C parser instead of
+    per-row dateutil inference, with the inference path as fallback for
+    anything else. utc=True normalizes mixed-offset exports (email from
+    several timezones) to one tz-aware column instead of raising.
+    """
+    if is_datetime64_any_dtype(series):
+        return series
+    try:
+        return pd.to_datetime(series, format='ISO8601', utc=True)
+    except (ValueError, TypeError):
+        return pd.to_datetime(series, errors='coerce', utc=True)
+
+_DAY_OF_WEEK_DTYPE = pd.CategoricalDtype(
+    categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    ordered=True
+)
+
+def _build_tz_automaton():
+    """Compile all timezone keywords into one Aho-Corasick automaton
+
+    A single automaton scans each text once in C instead of running one
+    substring search per keyword. Returns None if pyahocorasick is not
+    installed (the shared TIMEZONE_REGEX is used as fallback).
+    """
+    if ahocorasick is None:
+        return None
+    automaton = ahocorasick.Automaton()
+    for timezone, keywords in TIMEZONE_KEYWORDS.items():
+        for keyword in keywords:
+            automaton.add_word(keyword, timezone)
+    automaton.make_automaton()
+    return automaton
+
+# Built once at import and shared by every DataPreprocessor instance
+_TZ_AUTOMATON = _build_tz_automaton()
 
 class DataPreprocessor:
     def __init__(self):
         """Initialize the DataPreprocessor"""
-        self.timezone_mappings = {
-            "EST": ["new york", "eastern", "est", "edt"],
-            "PST": ["california", "pacific", "pst", "pdt"],
-            "GMT": ["london", "uk", "gmt", "utc"],
-            "CET": ["berlin", "paris", "cet", "cest"],
-            "JST": ["japan", "tokyo", "jst"],
-            "IST": ["india", "mumbai", "delhi", "ist"]
-        }
-    
+        self.timezone_mappings = TIMEZONE_KEYWORDS
+
     def preprocess_dataframe(self, df: pd.DataFrame) -> pd.DataFrame:
         """
         Preprocess a DataFrame containing text and timestamp data
@@ -39,34 +97,49 @@ class DataPreprocessor:
                 raise ValueError(f"Missing required column: {col}")
         
         # Convert timestamps
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
         df['datetime'] = df['timestamp']
         df['hour'] = df['datetime'].dt.hour
-        df['day_of_week'] = df['datetime'].dt.day_name()
+        df['day_of_week'] = df['datetime'].dt.day_name().astype(_DAY_OF_WEEK_DTYPE)
         
-        # Clean text
-        df['text'] = df['text'].apply(self._clean_text)
+        # Clean text (vectorized .str ops run the regex engine in C
+        # instead of dispatching a Python function per row)
+        df['text'] = self._clean_text_series(df['text'])
         
-        # Extract timezone if available
-        df['timezone'] = df['text'].apply(self._extract_timezone)
+        # Extract timezone if available (list comprehension avoids the
+        # per-row .apply overhead on top of the single-scan matcher)
+        df['timezone'] = pd.Categorical(
+            [self._extract_timezone(text) for text in df['text'].tolist()],
+            categories=list(self.timezone_mappings)
+        )
         
         return df
     
+    def _clean_text_series(self, texts: pd.Series) -> pd.Series:
+        """Vectorized version of _clean_text for whole columns"""
+        s = texts.astype(_TEXT_DTYPE)
+        s = (s.str.replace(_EMAIL_RE, '[EMAIL]', regex=True)
+              .str.replace(_URL_RE, '[URL]', regex=True)
+              .str.replace(_KEEP_RE, '', regex=True)
+              .str.replace(_WS_RE, ' ', regex=True)
+              .str.strip())
+        return s.fillna("")
+
     def _clean_text(self, text: str) -> str:
         """Clean text by removing unwanted elements"""
         if not isinstance(text, str):
             return str(text) if text is not None else ""
         
         # Remove URLs and emails
-        text = re.sub(r'\S+@\S+', '[EMAIL]', text)
-        text = re.sub(r'http\S+|www\S+', '[URL]', text)
-        
+        text = _EMAIL_RE.sub('[EMAIL]', text)
+        text = _URL_RE.sub('[URL]', text)
+
         # Remove special characters (keep basic punctuation)
-        text = re.sub(r'[^\w\s.:!?@#$%&*()+=\-\[\]{};\'",<>/|\\`~_^]', '', text)
-        
+        text = _KEEP_RE.sub('', text)
+
         # Normalize whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
+        text = _WS_RE.sub(' ', text).strip()
+
         return text
     
     def _extract_timezone(self, text: str) -> Optional[str]:
@@ -75,10 +148,12 @@ class DataPreprocessor:
             return None
         
         text = text.lower()
-        for timezone, keywords in self.timezone_mappings.items():
-            if any(keyword in text for keyword in keywords):
-                return timezone
-        return None
+        if _TZ_AUTOMATON is not None:
+            match = next(_TZ_AUTOMATON.iter(text), None)
+            return match[1] if match else None
+
+        match = TIMEZONE_REGEX.search(text)
+        return match.lastgroup if match else None
     
     def normalize_data(self, df: pd.DataFrame) -> pd.DataFrame:
         """
@@ -100,7 +175,7 @@ class DataPreprocessor:
         df['timestamp'] = df['timestamp'].fillna(datetime.now())
         
         # Convert types
-        df['text'] = df['text'].astype(str)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], errors='coerce')
+        df['text'] = df['text'].astype(_TEXT_DTYPE).fillna("")
+        df['timestamp'] = _parse_timestamps(df['timestamp'])
         
         return df
\ No newline at end of file
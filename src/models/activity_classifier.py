@@ -2,15 +2,98 @@ import pandas as pd
 import numpy as np
 from typing import Dict, List, Tuple, Optional
 import re
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, timedelta
 from src.api.huggingface_client import HuggingFaceClient
-from config.settings import ACTIVITY_LABELS, CONFIDENCE_THRESHOLD 
+from config.settings import ACTIVITY_LABELS, CONFIDENCE_THRESHOLD
+
+try:
+    from blake3 import blake3  # optional: faster digests for cache keys
+except ImportError:
+    blake3 = None
+
+# Bound on the in-memory classification cache (entries, not bytes)
+CLASSIFICATION_CACHE_SIZE = 4096
+
+# Low-cardinality output columns as categoricals: int8 codes instead of
+# one Python string per row, so downstream value_counts/groupby/isin
+# hash integers rather than strings
+_PREDICTED_ACTIVITY_DTYPE = pd.CategoricalDtype(
+    categories=list(dict.fromkeys(
+        label for labels in ACTIVITY_LABELS.values() for label in labels
+    ))
+)
+_DAY_OF_WEEK_DTYPE = pd.CategoricalDtype(
+    categories=['Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'],
+    ordered=True
+)
+
+def _cache_key(cleaned_text: str, labels: Tuple[str, ...]):
+    """Fixed-size cache key for a (text, labels) pair
+
+    Hashing keeps the cache from retaining every classified string as a
+    key; with blake3 installed the key is a 24-byte digest, otherwise
+    the built-in hash is used (fine for a non-crypto cache).
+    """
+    if blake3 is not None:
+        return (blake3(cleaned_text.encode()).digest()[:16]
+                + hash(labels).to_bytes(8, 'little', signed=True))
+    return hash((cleaned_text, labels))
+
+# Compiled once at import; _preprocess_text runs on every classified row
+_RE_WS = re.compile(r'\s+')
+_RE_EMAIL = re.compile(r'\S+@\S+')
+_RE_URL = re.compile(r'http\S+|www\S+')
+_RE_SPECIAL = re.compile(r'[^\w\s.:!?@#$%&*()+=\-\[\]{};\'",<>/|\\`~_^]')
+
+# Inverted activity→type index built once at import; the per-call
+# lookup in _categorize_activity_type is then O(1) instead of three
+# linear list scans
+_WORK_ACTIVITIES = frozenset({'Work', 'Studying', 'Meeting'})
+_LEISURE_ACTIVITIES = frozenset({'Entertainment', 'Socializing', 'Shopping'})
+_HEALTH_ACTIVITIES = frozenset({'Exercise', 'Eating', 'Sleeping'})
+_ACTIVITY_TYPE_MAP = (
+    {activity: 'productive' for activity in _WORK_ACTIVITIES}
+    | {activity: 'leisure' for activity in _LEISURE_ACTIVITIES}
+    | {activity: 'health_wellness' for activity in _HEALTH_ACTIVITIES}
+)
+
+# Keyword lookup table for _extract_keywords, lowercased once at import
+# so the per-call work is a single text.lower() plus substring checks
+_ACTIVITY_KEYWORDS = {
+    activity: tuple(keyword.lower() for keyword in keywords)
+    for activity, keywords in {
+        'Work': ['work', 'office', 'meeting', 'project', 'deadline', 'email', 'call'],
+        'Exercise': ['gym', 'run', 'workout', 'fitness', 'training', 'sports'],
+        'Travel': ['flight', 'airport', 'hotel', 'vacation', 'trip', 'destination'],
+        'Eating': ['lunch', 'dinner', 'breakfast', 'food', 'restaurant', 'cooking'],
+        'Shopping': ['buy', 'purchase', 'store', 'mall', 'shopping', 'amazon'],
+        'Socializing': ['friends', 'party', 'hangout', 'social', 'meet', 'chat'],
+        'Entertainment': ['movie', 'show', 'music', 'game', 'watch', 'play']
+    }.items()
+}
 
 class ActivityClassifier:
     def __init__(self):
-        self.hf_client = HuggingFaceClient()
+        self._hf_client = None
         self.activity_labels = ACTIVITY_LABELS
         self.confidence_threshold = CONFIDENCE_THRESHOLD
+        # Activity logs repeat heavily ("lunch", "meeting", ...); caching
+        # by a hash of (cleaned_text, labels) skips the API round-trip
+        # on repeats without retaining the full strings as keys
+        self._classification_cache: Dict = {}
+
+    @property
+    def hf_client(self) -> HuggingFaceClient:
+        """API client, created on first use
+
+        Instantiating the client opens the HTTP session and local cache;
+        deferring it keeps classifier construction (and cold start)
+        instantaneous for code paths that never call the API.
+        """
+        if self._hf_client is None:
+            self._hf_client = HuggingFaceClient()
+        return self._hf_client
         
     def classify_single_text(self, text: str, category: str = "general_activities") -> Dict:
         """Classify a single text into activity categories"""
@@ -21,35 +104,50 @@ class ActivityClassifier:
         
         if not cleaned_text.strip():
             return {"error": "Empty text after preprocessing"}
-        
+
+        cache_key = _cache_key(cleaned_text, tuple(labels))
+        cached = self._classification_cache.get(cache_key)
+        if cached is not None:
+            # Shallow copy so callers can annotate without poisoning the cache
+            return dict(cached)
+
         # Get classification from Hugging Face
         result = self.hf_client.classify_activity(cleaned_text, labels)
-        
+
         if not result:
             return {"error": "Failed to get classification from API"}
-        
+
         # Process and enhance results
         processed_result = self._process_classification_result(result, text)
-        
+
+        if len(self._classification_cache) >= CLASSIFICATION_CACHE_SIZE:
+            # Evict the oldest entry (dicts preserve insertion order)
+            self._classification_cache.pop(next(iter(self._classification_cache)))
+        self._classification_cache[cache_key] = processed_result
+
         return processed_result
     
     def classify_batch(self, texts: List[str], category: str = "general_activities") -> List[Dict]:
-        """Classify multiple texts at once"""
-        results = []
+        """Classify multiple texts at once
+
+        API calls for the whole batch run concurrently (async HTTP when
+        aiohttp is installed, thread-pooled chunks otherwise) so network
+        latency overlaps instead of accumulating one text at a time.
+        """
         labels = self.activity_labels.get(category, self.activity_labels["general_activities"])
-        
-        for text in texts:
-            cleaned_text = self._preprocess_text(text)
-            if cleaned_text.strip():
-                result = self.hf_client.classify_activity(cleaned_text, labels)
-                if result:
-                    processed_result = self._process_classification_result(result, text)
-                    results.append(processed_result)
-                else:
-                    results.append({"error": "API classification failed", "original_text": text})
+
+        cleaned_texts = [self._preprocess_text(text) for text in texts]
+        nonempty = [pos for pos, cleaned in enumerate(cleaned_texts) if cleaned.strip()]
+        api_results = self.hf_client.classify_batch_concurrent(
+            [cleaned_texts[pos] for pos in nonempty], labels)
+
+        results: List[Dict] = [{"error": "Empty text", "original_text": text} for text in texts]
+        for pos, api_result in zip(nonempty, api_results):
+            if api_result:
+                results[pos] = self._process_classification_result(api_result, texts[pos])
             else:
-                results.append({"error": "Empty text", "original_text": text})
-        
+                results[pos] = {"error": "API classification failed", "original_text": texts[pos]}
+
         return results
     
     def classify_with_context(self, data: pd.DataFrame) -> pd.DataFrame:
@@ -62,60 +160,107 @@ class ActivityClassifier:
         for col in required_cols:
             if col not in data.columns:
                 raise ValueError(f"Required column '{col}' not found in data")
-        
+
+        # Work on a copy: assigning columns in place is still cheaper
+        # than the old concat, but the caller's frame (e.g. the cached
+        # uploaded data on the timeline page) must not change identity
+        # or content under its cache key
+        data = data.copy()
+
         # Convert timestamp to datetime
         data['datetime'] = pd.to_datetime(data['timestamp'])
         data['hour'] = data['datetime'].dt.hour
-        data['day_of_week'] = data['datetime'].dt.day_name()
-        
-        # Classify each text
-        classifications = []
-        for idx, row in data.iterrows():
-            # Determine activity category based on time context
-            category = self._determine_category_by_time(row['hour'])
-            
-            # Add temporal context to text
-            contextual_text = self._add_temporal_context(row['text'], row['hour'], row['day_of_week'])
-            
-            # Classify
-            result = self.classify_single_text(contextual_text, category)
-            result['original_text'] = row['text']
-            result['hour'] = row['hour']
-            result['day_of_week'] = row['day_of_week']
-            
-            classifications.append(result)
-        
-        # Add classification results to dataframe
-        classification_df = pd.DataFrame(classifications)
-        result_df = pd.concat([data.reset_index(drop=True), classification_df], axis=1)
-        
-        return result_df
+        data['day_of_week'] = data['datetime'].dt.day_name().astype(_DAY_OF_WEEK_DTYPE)
+
+        hours = data['hour'].to_numpy()
+        day_names = data['day_of_week'].astype(str).to_numpy()
+        original_texts = data['text'].astype(str).tolist()
+
+        # Determine activity category by time context, vectorized
+        # (mirrors _determine_category_by_time over the whole column)
+        categories = np.where((hours >= 9) & (hours < 22),
+                              "general_activities", "daily_routine")
+
+        # Add temporal context to each text, vectorized
+        prefix = pd.Series(np.select(
+            [(hours >= 6) & (hours < 12),
+             (hours >= 12) & (hours < 17),
+             (hours >= 17) & (hours < 22)],
+            ["In the morning: ", "In the afternoon: ", "In the evening: "],
+            default="Late at night: "
+        ), index=data.index)
+        # Integer comparison on dayofweek instead of string matching
+        weekend = data['datetime'].dt.dayofweek >= 5
+        prefix = prefix.where(~weekend, prefix + "On " + data['day_of_week'].astype(str) + " ")
+        contextual_texts = prefix + data['text'].astype(str)
+
+        cleaned_texts = self.preprocess_series(contextual_texts).tolist()
+
+        # One batched API call per category group instead of one HTTP
+        # round-trip per row; duplicate texts within a group are
+        # classified once and the result scattered back to every repeat
+        classifications: List[Optional[Dict]] = [None] * len(data)
+        positions = np.arange(len(data))
+        for category in np.unique(categories):
+            labels = self.activity_labels.get(category, self.activity_labels["general_activities"])
+            in_category = [pos for pos in positions[categories == category]
+                           if cleaned_texts[pos].strip()]
+            if not in_category:
+                continue
+            unique_texts, inverse = np.unique(
+                np.asarray([cleaned_texts[pos] for pos in in_category], dtype=object),
+                return_inverse=True)
+            api_results = self.hf_client.batch_classify(unique_texts.tolist(), labels)
+            for pos, unique_pos in zip(in_category, inverse):
+                api_result = api_results[unique_pos]
+                if api_result:
+                    classifications[pos] = self._process_classification_result(
+                        api_result, original_texts[pos])
+                else:
+                    classifications[pos] = {"error": "Failed to get classification from API"}
+
+        for pos in positions:
+            if classifications[pos] is None:
+                classifications[pos] = {"error": "Empty text after preprocessing"}
+            classifications[pos]['original_text'] = original_texts[pos]
+            classifications[pos]['hour'] = int(hours[pos])
+            classifications[pos]['day_of_week'] = day_names[pos]
+
+        # Assign result columns directly onto the frame: one allocation
+        # per column instead of concat copying the whole frame (and no
+        # duplicated hour/day_of_week columns from a second frame)
+        data['predicted_activity'] = pd.Categorical(
+            [c.get('predicted_activity') for c in classifications],
+            dtype=_PREDICTED_ACTIVITY_DTYPE)
+        data['confidence'] = [c.get('confidence') for c in classifications]
+        data['all_predictions'] = [c.get('all_predictions') for c in classifications]
+        data['high_confidence'] = [c.get('high_confidence') for c in classifications]
+        data['insights'] = [c.get('insights') for c in classifications]
+        errors = [c.get('error') for c in classifications]
+        if any(error is not None for error in errors):
+            data['error'] = errors
+
+        return data
     
     def detect_routine_activities(self, data: pd.DataFrame) -> Dict[str, List]:
         """Detect recurring routine activities"""
         if 'predicted_activity' not in data.columns:
             data = self.classify_with_context(data)
         
-        routines = {
-            'morning_routine': [],
-            'work_routine': [],
-            'evening_routine': [],
-            'weekend_routine': []
-        }
-        
         # Group by time periods
-        morning_data = data[data['hour'].between(6, 11)]
-        work_data = data[data['hour'].between(9, 17)]
-        evening_data = data[data['hour'].between(18, 23)]
-        weekend_data = data[data['day_of_week'].isin(['Saturday', 'Sunday'])]
-        
-        # Find common activities in each period
-        routines['morning_routine'] = self._find_common_activities(morning_data)
-        routines['work_routine'] = self._find_common_activities(work_data)
-        routines['evening_routine'] = self._find_common_activities(evening_data)
-        routines['weekend_routine'] = self._find_common_activities(weekend_data)
-        
-        return routines
+        period_data = {
+            'morning_routine': data[data['hour'].between(6, 11)],
+            'work_routine': data[data['hour'].between(9, 17)],
+            'evening_routine': data[data['hour'].between(18, 23)],
+            'weekend_routine': data[data['datetime'].dt.dayofweek >= 5]
+        }
+
+        # The four period passes are independent groupby/value_counts
+        # work (GIL-releasing), so they overlap on a small thread pool
+        with ThreadPoolExecutor(max_workers=4) as executor:
+            futures = {period: executor.submit(self._find_common_activities, period_df)
+                       for period, period_df in period_data.items()}
+            return {period: future.result() for period, future in futures.items()}
     
     def _preprocess_text(self, text: str) -> str:
         """Clean and preprocess text for classification"""
@@ -123,14 +268,14 @@ class ActivityClassifier:
             return str(text) if text is not None else ""
         
         # Remove extra whitespace
-        text = re.sub(r'\s+', ' ', text).strip()
-        
+        text = _RE_WS.sub(' ', text).strip()
+
         # Remove email addresses and URLs
-        text = re.sub(r'\S+@\S+', '[EMAIL]', text)
-        text = re.sub(r'http\S+|www\S+', '[URL]', text)
-        
+        text = _RE_EMAIL.sub('[EMAIL]', text)
+        text = _RE_URL.sub('[URL]', text)
+
         # Remove special characters but keep emoticons
-        text = re.sub(r'[^\w\s.:!?@#$%&*()+=\-\[\]{};\'",<>/|\\`~_^]', '', text)
+        text = _RE_SPECIAL.sub('', text)
         
         # Limit length
         if len(text) > 512:
@@ -138,6 +283,21 @@ class ActivityClassifier:
         
         return text
     
+    def preprocess_series(self, texts: pd.Series) -> pd.Series:
+        """Vectorized _preprocess_text over a whole column
+
+        Runs the same substitutions through Series.str (regex engine
+        iterates the column in C) instead of one Python call per row.
+        """
+        s = texts.astype('string')
+        s = (s.str.replace(_RE_WS, ' ', regex=True)
+              .str.strip()
+              .str.replace(_RE_EMAIL, '[EMAIL]', regex=True)
+              .str.replace(_RE_URL, '[URL]', regex=True)
+              .str.replace(_RE_SPECIAL, '', regex=True)
+              .str.slice(0, 512))
+        return s.fillna("")
+
     def _process_classification_result(self, result: Dict, original_text: str) -> Dict:
         """Process and enhance classification results"""
         if 'labels' not in result or 'scores' not in result:
@@ -194,21 +354,25 @@ class ActivityClassifier:
         if data.empty or 'predicted_activity' not in data.columns:
             return []
         
+        # One grouped mean instead of re-masking the frame per activity;
+        # value_counts is already sorted by frequency descending. The
+        # explicit > 0 guard keeps categorical zero-count categories —
+        # absent from the (observed) groupby mean — out of the lookup
+        # even when min_frequency is lowered to zero
         activity_counts = data['predicted_activity'].value_counts()
-        common_activities = activity_counts[activity_counts >= min_frequency]
-        
-        results = []
-        for activity, count in common_activities.items():
-            avg_confidence = data[data['predicted_activity'] == activity]['confidence'].mean()
-            
-            results.append({
+        common_activities = activity_counts[
+            (activity_counts >= min_frequency) & (activity_counts > 0)]
+        avg_confidences = data.groupby('predicted_activity')['confidence'].mean()
+
+        return [
+            {
                 'activity': activity,
                 'frequency': count,
-                'average_confidence': avg_confidence,
+                'average_confidence': avg_confidences[activity],
                 'percentage': (count / len(data)) * 100
-            })
-        
-        return sorted(results, key=lambda x: x['frequency'], reverse=True)
+            }
+            for activity, count in common_activities.items()
+        ]
     
     def _generate_activity_insights(self, activity: str, confidence: float, text: str) -> Dict:
         """Generate insights about the classified activity"""
@@ -222,33 +386,10 @@ class ActivityClassifier:
     
     def _categorize_activity_type(self, activity: str) -> str:
         """Categorize activity into broader types"""
-        work_activities = ['Work', 'Studying', 'Meeting']
-        leisure_activities = ['Entertainment', 'Socializing', 'Shopping']
-        health_activities = ['Exercise', 'Eating', 'Sleeping']
-        
-        if activity in work_activities:
-            return 'productive'
-        elif activity in leisure_activities:
-            return 'leisure'
-        elif activity in health_activities:
-            return 'health_wellness'
-        else:
-            return 'other'
+        return _ACTIVITY_TYPE_MAP.get(activity, 'other')
     
     def _extract_keywords(self, text: str, activity: str) -> List[str]:
         """Extract relevant keywords that led to the classification"""
-        # Simple keyword extraction based on activity type
-        activity_keywords = {
-            'Work': ['work', 'office', 'meeting', 'project', 'deadline', 'email', 'call'],
-            'Exercise': ['gym', 'run', 'workout', 'fitness', 'training', 'sports'],
-            'Travel': ['flight', 'airport', 'hotel', 'vacation', 'trip', 'destination'],
-            'Eating': ['lunch', 'dinner', 'breakfast', 'food', 'restaurant', 'cooking'],
-            'Shopping': ['buy', 'purchase', 'store', 'mall', 'shopping', 'amazon'],
-            'Socializing': ['friends', 'party', 'hangout', 'social', 'meet', 'chat'],
-            'Entertainment': ['movie', 'show', 'music', 'game', 'watch', 'play']
-        }
-        
-        keywords = activity_keywords.get(activity, [])
-        found_keywords = [kw for kw in keywords if kw.lower() in text.lower()]
-        
-        return found_keywords
\ No newline at end of file
+        # Lowercase the text once instead of once per keyword
+        text_lower = text.lower()
+        return [kw for kw in _ACTIVITY_KEYWORDS.get(activity, ()) if kw in text_lower]
\ No newline at end of file
@@ -1,11 +1,53 @@
 import pandas as pd
 import numpy as np
+from pandas.api.types import is_datetime64_any_dtype
 from datetime import datetime, timedelta
 from typing import Dict, List, Tuple, Optional
 import plotly.graph_objects as go
 import plotly.express as px
 from plotly.subplots import make_subplots
 
+try:
+    from numba import njit
+except ImportError:
+    # Optional: the numeric kernels below also run fine un-jitted
+    def njit(*args, **kwargs):
+        if args and callable(args[0]):
+            return args[0]
+        def decorator(func):
+            return func
+        return decorator
+
+@njit(cache=True)
+def _slope(values: np.ndarray) -> float:
+    """Least-squares slope of evenly spaced values (closed form)
+
+    Avoids np.polyfit's full Vandermonde/lstsq machinery for a 1-degree
+    fit.
+    """
+    n = values.size
+    x_mean = (n - 1) / 2.0
+    y_mean = values.mean()
+    num = 0.0
+    den = 0.0
+    for i in range(n):
+        dx = i - x_mean
+        num += dx * (values[i] - y_mean)
+        den += dx * dx
+    return num / den
+
+@njit(cache=True)
+def _find_anomalies(counts: np.ndarray, expected: np.ndarray, std: float):
+    """Indices and severities of days deviating > 2 std from expected"""
+    indices = []
+    severities = []
+    for i in range(counts.size):
+        deviation = abs(counts[i] - expected[i])
+        if deviation > 2 * std:  # NaN-expected days compare False
+            indices.append(i)
+            severities.append(deviation / std)
+    return indices, severities
+
 class TimelineBuilder:
     def __init__(self):
         self.timeline_data = []
@@ -13,80 +55,136 @@ class TimelineBuilder:
         
     def build_activity_timeline(self, data: pd.DataFrame) -> Dict:
         """Build comprehensive activity timeline"""
-        
+
         # Fix duplicate columns issue
         data = data.loc[:, ~data.columns.duplicated()]
-        
+
         if data.empty:
             return {}
-        
-        # Rest of your existing method...
+
+        # Derive the calendar fields once; every sub-method reuses them
+        # instead of re-running the .dt accessors over the full column
+        data = self._add_time_fields(data)
+
         timeline = {
             'daily_timeline': self._create_daily_timeline(data),
-            # ... other timeline components
+            'weekly_patterns': self._create_weekly_patterns(data),
+            'monthly_overview': self._create_monthly_overview(data),
+            'major_events': self._identify_major_events(data),
+            'activity_trends': self._analyze_activity_trends(data)
         }
-        
+
         return timeline
-    
+
+    def _add_time_fields(self, data: pd.DataFrame) -> pd.DataFrame:
+        """Attach the per-row calendar fields the sub-methods need
+
+        Idempotent: returns the frame unchanged when the fields are
+        already present, so sub-methods stay callable standalone.
+        """
+        if 'iso_week' in data.columns and 'month' in data.columns:
+            return data
+
+        if 'datetime' not in data.columns:
+            if 'timestamp' not in data.columns:
+                return data
+            data = data.assign(datetime=pd.to_datetime(data['timestamp'], cache=True))
+        elif not is_datetime64_any_dtype(data['datetime']):
+            data = data.assign(datetime=pd.to_datetime(data['datetime'], cache=True))
+
+        dt = data['datetime'].dt
+        return data.assign(
+            date=dt.date,
+            hour=dt.hour,
+            day_of_week=dt.day_name(),
+            week=dt.to_period('W'),
+            iso_week=dt.isocalendar().week,
+            year=dt.year,
+            month=dt.to_period('M')
+        )
+
     def _create_daily_timeline(self, data: pd.DataFrame) -> Dict:
         """Create daily timeline breakdown"""
-        
-        # Ensure data doesn't have duplicate columns
-        data = data.loc[:, ~data.columns.duplicated()]
-        
-        # Ensure datetime column exists and is properly formatted
-        if 'datetime' not in data.columns:
-            if 'timestamp' in data.columns:
-                data['datetime'] = pd.to_datetime(data['timestamp'])
-            else:
-                return {}
-        
-        data['datetime'] = pd.to_datetime(data['datetime'])
-        data['date'] = data['datetime'].dt.date
-        data['hour'] = data['datetime'].dt.hour
-        
+        if data.empty:
+            return {}
+
+        # Duplicate-column dedup happens once in build_activity_timeline;
+        # _add_time_fields is a no-op when the caller already ran it
+        data = self._add_time_fields(data)
+        if 'date' not in data.columns:
+            return {}
+
+        # One grouped pass computes every per-day stat instead of
+        # re-masking the frame once per date
+        day_stats = data.groupby('date', sort=True)['hour'].agg(
+            total_activities='size',
+            active_hours='nunique',
+            first_activity='min',
+            last_activity='max'
+        )
+
+        activities_by_date = {}
+        hourly_by_date = {}
+        activity_columns: List = []
+        empty_hourly = np.zeros((24, 0), dtype=np.int16)
+        if 'predicted_activity' in data.columns:
+            activity_counts = data.groupby('date')['predicted_activity'].value_counts()
+            activities_by_date = {date: counts.droplevel(0).to_dict()
+                                  for date, counts in activity_counts.groupby(level=0)}
+            # 24 x activities int16 count matrix per day instead of a
+            # Python list of strings per (day, hour); the column labels
+            # are shared across every day rather than repeated per hour
+            hourly_counts = pd.crosstab(
+                [data['date'], data['hour']], data['predicted_activity']).astype('int16')
+            activity_columns = hourly_counts.columns.tolist()
+            empty_hourly = np.zeros((24, len(activity_columns)), dtype=np.int16)
+            hourly_by_date = {
+                date: (counts.droplevel(0)
+                       .reindex(range(24), fill_value=0)
+                       .to_numpy())
+                for date, counts in hourly_counts.groupby(level=0)}
+
         daily_timeline = {}
-        
-        for date in sorted(data['date'].unique()):
-            day_data = data[data['date'] == date]
-            
+        for date, row in day_stats.iterrows():
             daily_timeline[str(date)] = {
-                'total_activities': len(day_data),
-                'active_hours': day_data['hour'].nunique(),  # Use nunique() instead of len(unique())
-                'first_activity': day_data['hour'].min(),
-                'last_activity': day_data['hour'].max(),
-                'activities': day_data['predicted_activity'].value_counts().to_dict() if 'predicted_activity' in day_data.columns else {},
-                'hourly_breakdown': day_data.groupby('hour')['predicted_activity'].apply(list).to_dict() if 'predicted_activity' in day_data.columns else {}
+                'total_activities': int(row['total_activities']),
+                'active_hours': int(row['active_hours']),
+                'first_activity': int(row['first_activity']),
+                'last_activity': int(row['last_activity']),
+                'activities': activities_by_date.get(date, {}),
+                'hourly_counts': hourly_by_date.get(date, empty_hourly),
+                'activity_columns': activity_columns
             }
-        
+
         return daily_timeline
 
     def _create_weekly_patterns(self, data: pd.DataFrame) -> Dict:
         """Analyze weekly activity patterns"""
         if data.empty:
             return {}
-        
-        data['day_of_week'] = data['datetime'].dt.day_name()
-        data['week'] = data['datetime'].dt.isocalendar().week
-        data['year'] = data['datetime'].dt.year
-        
+
+        data = self._add_time_fields(data)
+
         weekly_patterns = {}
         
-        # Activity distribution by day of week
+        # Activity distribution by day of week, oriented {day:
+        # {activity: count}} — the shape the weekly heatmap indexes
         day_activity = data.groupby(['day_of_week', 'predicted_activity']).size().unstack(fill_value=0)
-        weekly_patterns['activity_by_day'] = day_activity.to_dict()
+        weekly_patterns['activity_by_day'] = day_activity.to_dict(orient='index')
         
         # Weekly activity volume
-        weekly_volume = data.groupby(['year', 'week']).size()
+        weekly_volume = data.groupby(['year', 'iso_week']).size()
         weekly_patterns['weekly_volume'] = {
             'average': weekly_volume.mean(),
             'std': weekly_volume.std(),
             'trend': self._calculate_trend(weekly_volume.values)
         }
         
-        # Weekend vs Weekday patterns
-        weekends = data[data['day_of_week'].isin(['Saturday', 'Sunday'])]
-        weekdays = data[~data['day_of_week'].isin(['Saturday', 'Sunday'])]
+        # Weekend vs Weekday patterns: one integer comparison on
+        # dayofweek instead of two string-matching isin scans
+        weekend_mask = data['datetime'].dt.dayofweek >= 5
+        weekends = data[weekend_mask]
+        weekdays = data[~weekend_mask]
         
         weekly_patterns['weekend_vs_weekday'] = {
             'weekend_activities': weekends['predicted_activity'].value_counts().to_dict() if not weekends.empty else {},
@@ -101,9 +199,9 @@ class TimelineBuilder:
         """Create monthly activity overview"""
         if data.empty:
             return {}
-        
-        data['month'] = data['datetime'].dt.to_period('M')
-        
+
+        data = self._add_time_fields(data)
+
         monthly_overview = {}
         
         for month in data['month'].unique():
@@ -129,28 +227,30 @@ class TimelineBuilder:
         
         if data.empty or len(data) < 10:
             return events
-        
+
+        data = self._add_time_fields(data)
+
         # Detect significant activity changes
-        data['date'] = data['datetime'].dt.date
         daily_counts = data.groupby('date').size()
         
         # Calculate rolling average
         rolling_avg = daily_counts.rolling(window=7, center=True).mean()
-        
-        # Find anomalies
-        for date, count in daily_counts.items():
-            expected = rolling_avg.get(date, count)
-            if abs(count - expected) > 2 * daily_counts.std():
-                event_type = "high_activity" if count > expected else "low_activity"
-                
-                events.append({
-                    'date': date,
-                    'type': event_type,
-                    'severity': abs(count - expected) / daily_counts.std(),
-                    'description': f"Unusual {event_type.replace('_', ' ')} detected",
-                    'activity_count': count,
-                    'expected_count': expected
-                })
+
+        # Find anomalies with the jitted numeric scan (std hoisted once)
+        counts = daily_counts.to_numpy(dtype=np.float64)
+        expected = rolling_avg.to_numpy(dtype=np.float64)
+        indices, severities = _find_anomalies(counts, expected, daily_counts.std())
+
+        for i, severity in zip(indices, severities):
+            event_type = "high_activity" if counts[i] > expected[i] else "low_activity"
+            events.append({
+                'date': daily_counts.index[i],
+                'type': event_type,
+                'severity': severity,
+                'description': f"Unusual {event_type.replace('_', ' ')} detected",
+                'activity_count': int(counts[i]),
+                'expected_count': expected[i]
+            })
         
         # Detect activity type changes
         events.extend(self._detect_activity_type_changes(data))
@@ -166,9 +266,10 @@ class TimelineBuilder:
             return {}
         
         trends = {}
-        
+
+        data = self._add_time_fields(data)
+
         # Overall activity trend
-        data['week'] = data['datetime'].dt.to_period('W')
         weekly_counts = data.groupby('week').size()
         
         if len(weekly_counts) > 2:
@@ -209,60 +310,69 @@ class TimelineBuilder:
         
         return visualizations
     
+    def _iter_activity_gaps(self, timeline: List[Dict]):
+        """Yield timeline entries with inactivity gaps spliced in
+
+        Lazy counterpart of _add_activity_gaps: consumers stream through
+        the enhanced timeline without a second 2N-entry list being
+        materialized. Gap durations come from one vectorized
+        Timestamp/Timedelta diff instead of two strptime calls per
+        adjacent pair.
+        """
+        if len(timeline) < 2:
+            yield from timeline
+            return
+
+        times = pd.to_datetime([activity['time'] for activity in timeline], format='%H:%M')
+        gap_hours = (times[1:] - times[:-1]).total_seconds() / 3600
+
+        for i, activity in enumerate(timeline):
+            yield activity
+
+            # Check for gaps of more than 2 hours before the next activity
+            if i < len(timeline) - 1 and gap_hours[i] > 2:
+                yield {
+                    'time': 'gap',
+                    'activity': 'Inactive Period',
+                    'confidence': 0,
+                    'text_preview': f"No activity detected for {gap_hours[i]:.1f} hours",
+                    'is_gap': True
+                }
+
     def _add_activity_gaps(self, timeline: List[Dict]) -> List[Dict]:
         """Add gaps between activities to show periods of inactivity"""
         if len(timeline) < 2:
             return timeline
-        
-        enhanced_timeline = []
-        
-        for i, activity in enumerate(timeline):
-            enhanced_timeline.append(activity)
-            
-            # Check for gaps between activities
-            if i < len(timeline) - 1:
-                current_time = datetime.strptime(activity['time'], '%H:%M')
-                next_time = datetime.strptime(timeline[i + 1]['time'], '%H:%M')
-                
-                gap_duration = (next_time - current_time).total_seconds() / 3600  # hours
-                
-                if gap_duration > 2:  # Gap of more than 2 hours
-                    enhanced_timeline.append({
-                        'time': 'gap',
-                        'activity': 'Inactive Period',
-                        'confidence': 0,
-                        'text_preview': f"No activity detected for {gap_duration:.1f} hours",
-                        'is_gap': True
-                    })
-        
-        return enhanced_timeline
+        return list(self._iter_activity_gaps(timeline))
     
     def _calculate_trend(self, values: np.ndarray) -> float:
         """Calculate trend using linear regression slope"""
         if len(values) < 2:
             return 0
-        
-        x = np.arange(len(values))
-        coefficients = np.polyfit(x, values, 1)
-        return coefficients[0]  # Slope
+
+        return float(_slope(np.asarray(values, dtype=np.float64)))
     
     def _calculate_activity_distribution(self, data: pd.DataFrame) -> Dict:
         """Calculate activity distribution statistics"""
         if 'predicted_activity' not in data.columns:
             return {}
         
+        # On categorical columns value_counts keeps zero-count
+        # categories that the (observed) groupby mean never produces;
+        # drop them so the lookup below cannot miss
         activity_counts = data['predicted_activity'].value_counts()
+        activity_counts = activity_counts[activity_counts > 0]
+        avg_confidences = data.groupby('predicted_activity')['confidence'].mean()
         total = len(data)
-        
-        distribution = {}
-        for activity, count in activity_counts.items():
-            distribution[activity] = {
+
+        return {
+            activity: {
                 'count': count,
                 'percentage': (count / total) * 100,
-                'avg_confidence': data[data['predicted_activity'] == activity]['confidence'].mean()
+                'avg_confidence': avg_confidences[activity]
             }
-        
-        return distribution
+            for activity, count in activity_counts.items()
+        }
     
     def _detect_activity_type_changes(self, data: pd.DataFrame) -> List[Dict]:
         """Detect significant changes in activity types"""
@@ -270,10 +380,10 @@ class TimelineBuilder:
         
         if 'predicted_activity' not in data.columns:
             return events
-        
+
         # Group by week and analyze activity type distribution
-        data['week'] = data['datetime'].dt.to_period('W')
-        
+        data = self._add_time_fields(data)
+
         weekly_activity_dist = {}
         for week in data['week'].unique():
             week_data = data[data['week'] == week]
@@ -320,33 +430,20 @@ class TimelineBuilder:
         if travel_data.empty:
             return events
         
-        # Group consecutive travel activities
-        travel_data = travel_data.sort_values('datetime')
-        travel_data['date'] = travel_data['datetime'].dt.date
-        
-        dates = travel_data['date'].unique()
-        travel_periods = []
-        current_period = []
-        
-        for i, date in enumerate(sorted(dates)):
-            if not current_period or (date - current_period[-1]).days <= 1:
-                current_period.append(date)
-            else:
-                if len(current_period) >= 1:
-                    travel_periods.append(current_period)
-                current_period = [date]
-        
-        if current_period:
-            travel_periods.append(current_period)
-        
+        # Group consecutive travel days: np.unique sorts the days, and a
+        # gap of more than one day starts a new period
+        travel_days = np.unique(travel_data['datetime'].to_numpy().astype('datetime64[D]'))
+        period_starts = np.nonzero(np.diff(travel_days).astype(int) > 1)[0] + 1
+        travel_periods = np.split(travel_days, period_starts)
+
         for period in travel_periods:
             if len(period) >= 2:  # Multi-day travel
                 events.append({
-                    'date': period[0],
+                    'date': period[0].astype(object),
                     'type': 'travel_period',
                     'severity': len(period),
                     'description': f"{len(period)}-day travel period detected",
-                    'end_date': period[-1]
+                    'end_date': period[-1].astype(object)
                 })
         
         return events
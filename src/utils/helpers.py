@@ -4,30 +4,72 @@ import pandas as pd
 from datetime import datetime
 import json
 
+try:
+    import orjson  # optional: Rust JSON codec with native numpy/datetime support
+except ImportError:
+    orjson = None
+
+def hash_dataframe(df: pd.DataFrame) -> tuple:
+    """
+    Cheap DataFrame fingerprint for cache keys
+
+    Hashes row content column by column, skipping columns pandas cannot
+    hash (e.g. the classifier's dict-valued all_predictions/insights
+    columns), so frames carrying nested payloads still key cleanly.
+
+    Args:
+        df: Input DataFrame
+
+    Returns:
+        Tuple of frame shape and summed per-column row hashes
+    """
+    total = 0
+    for _, column in df.items():
+        try:
+            total += int(pd.util.hash_pandas_object(column, index=False).sum())
+        except TypeError:
+            continue
+    return (df.shape, total)
+
 def save_to_json(data: Any, filename: str) -> None:
     """
     Save data to JSON file
-    
+
     Args:
         data: Data to save
         filename: Output filename
     """
+    if orjson is not None:
+        # Encodes numpy scalars and datetimes natively, straight to
+        # bytes; NON_STR_KEYS matches stdlib json's coercion of the
+        # int-keyed dicts the pattern analyzers emit (hourly_activity,
+        # hourly_distribution)
+        with open(filename, 'wb') as f:
+            f.write(orjson.dumps(
+                data,
+                option=(orjson.OPT_INDENT_2 | orjson.OPT_SERIALIZE_NUMPY
+                        | orjson.OPT_NAIVE_UTC | orjson.OPT_NON_STR_KEYS),
+                default=str
+            ))
+        return
     with open(filename, 'w', encoding='utf-8') as f:
         json.dump(data, f, indent=2, default=str)
 
 def load_from_json(filename: str) -> Any:
     """
     Load data from JSON file
-    
+
     Args:
         filename: Input filename
-    
+
     Returns:
         Loaded data
     """
     try:
-        with open(filename, 'r', encoding='utf-8') as f:
-            return json.load(f)
+        with open(filename, 'rb') as f:
+            if orjson is not None:
+                return orjson.loads(f.read())
+            return json.loads(f.read())
     except FileNotFoundError:
         return None
 
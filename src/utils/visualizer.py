@@ -1,71 +1,194 @@
 # src/utils/visualizer.py
+import json
+from collections import Counter
+
+import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import plotly.io as pio
 import pandas as pd
+import streamlit as st
 from typing import Dict, List
 
-def create_activity_pie_chart(data: pd.DataFrame, column: str = 'predicted_activity') -> go.Figure:
+from src.utils.helpers import hash_dataframe
+
+# Key cached figures by a cheap DataFrame fingerprint (shape + row
+# hashes, tolerant of dict-valued columns) instead of letting
+# Streamlit pickle the whole frame per call
+try:
+    import orjson  # noqa: F401
+    # Serialize every figure through orjson rather than stdlib json;
+    # the timeline chart's datetime array is the hot path
+    pio.json.config.default_engine = 'orjson'
+except ImportError:
+    pass
+
+_DF_HASH = {pd.DataFrame: hash_dataframe}
+
+# Point cap for the timeline scatter: beyond this the browser payload
+# dominates render time
+MAX_TIMELINE_POINTS = 2000
+
+def _downsample_timeline(data: pd.DataFrame) -> pd.DataFrame:
+    """Sample the frame down to MAX_TIMELINE_POINTS rows
+
+    Sampling is proportional per activity (minimum one row each) so
+    rare classes stay visible; the fixed seed keeps the cached figure
+    stable across reruns.
+    """
+    if len(data) <= MAX_TIMELINE_POINTS:
+        return data
+    total = len(data)
+    sampled = [
+        group.sample(min(len(group), max(1, int(MAX_TIMELINE_POINTS * len(group) / total))),
+                     random_state=0)
+        for _, group in data.groupby('predicted_activity', observed=True)
+    ]
+    return pd.concat(sampled).sort_values('datetime')
+
+def _fig_to_json(fig: go.Figure) -> str:
+    """Serialize a figure once at build time
+
+    Caching the JSON string instead of the Figure object means reruns
+    skip both trace construction and re-serialization (pio.to_json uses
+    orjson automatically when installed).
+    """
+    return pio.to_json(fig)
+
+def render_cached(fig_json: str) -> None:
+    """Render a pre-serialized figure produced by the create_* helpers"""
+    st.plotly_chart(json.loads(fig_json), use_container_width=True)
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=_DF_HASH)
+def create_activity_pie_chart(data: pd.DataFrame, column: str = 'predicted_activity') -> str:
     """
     Create a pie chart for activity distribution
-    
+
+    Cached across Streamlit reruns; rebuilt only when the data changes.
+
     Args:
         data: DataFrame with activity data
         column: Column name containing activities
-    
+
     Returns:
-        Plotly Figure
+        Plotly figure JSON (render with render_cached)
     """
-    activity_counts = data[column].value_counts()
+    # Counter beats value_counts at activity-label cardinality: no
+    # Series construction or sort, just one dict pass. Nulls (API-error
+    # rows leave predicted_activity unset) are dropped first, matching
+    # the value_counts default this replaced
+    col = data[column].dropna()
+    if getattr(col.dtype, 'pyarrow_dtype', None) is not None:
+        # Arrow-backed columns can arrive as many small chunks (e.g.
+        # straight from read_csv); one contiguous pass beats per-chunk
+        # dispatch in the counting loop
+        col = col.astype(object)
+    activity_counts = Counter(col.to_numpy())
     fig = px.pie(
-        values=activity_counts.values,
-        names=activity_counts.index,
+        values=list(activity_counts.values()),
+        names=list(activity_counts.keys()),
         title="Activity Distribution"
     )
-    return fig
+    return _fig_to_json(fig)
 
-def create_confidence_histogram(data: pd.DataFrame, column: str = 'confidence') -> go.Figure:
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=_DF_HASH)
+def create_confidence_histogram(data: pd.DataFrame, column: str = 'confidence') -> str:
     """
     Create a histogram for confidence scores
-    
+
+    Cached across Streamlit reruns; rebuilt only when the data changes.
+
     Args:
         data: DataFrame with confidence scores
         column: Column name containing confidence scores
-    
+
     Returns:
-        Plotly Figure
+        Plotly figure JSON (render with render_cached)
     """
-    fig = px.histogram(
-        data,
-        x=column,
-        nbins=20,
+    # Bin in NumPy and ship 20 bar heights instead of handing Plotly
+    # Express the whole column to re-bin client-side
+    scores = data[column].to_numpy(dtype=np.float32)
+    counts, edges = np.histogram(scores, bins=20, range=(0.0, 1.0))
+    centers = (edges[:-1] + edges[1:]) / 2
+    fig = go.Figure(go.Bar(x=centers, y=counts, width=edges[1] - edges[0]))
+    fig.update_layout(
         title="Confidence Score Distribution",
-        labels={column: "Confidence Score"}
+        xaxis_title="Confidence Score",
+        yaxis_title="count",
+        bargap=0
     )
-    return fig
+    return _fig_to_json(fig)
 
-def create_timeline_chart(data: pd.DataFrame) -> go.Figure:
+def create_timeline_chart(data: pd.DataFrame) -> str:
     """
     Create a timeline chart for activities
-    
+
+    Rendered with WebGL (Scattergl) markers: SVG text labels are gone —
+    the activity for a point is carried by its trace legend entry and
+    hover — in exchange for first paints that stay flat as the row
+    count grows.
+
     Args:
         data: DataFrame with datetime and activity columns
-    
+
     Returns:
-        Plotly Figure
+        Plotly figure JSON (render with render_cached)
+    """
+    # Cache on just the plotted columns so unrelated column changes
+    # don't invalidate the figure
+    return _create_timeline_chart_cached(data[['datetime', 'predicted_activity']])
+
+@st.cache_data(show_spinner=False, max_entries=8, hash_funcs=_DF_HASH)
+def get_figs(data: pd.DataFrame) -> Dict[str, str]:
+    """All three standard figures for a classified frame, in one entry
+
+    Pages navigating away and back re-render from this bundle instead
+    of rebuilding each chart; call get_figs.clear() (exposed as a
+    button on the analysis page) when the underlying data is expected
+    to change under the same fingerprint.
     """
+    return {
+        'pie': create_activity_pie_chart(data),
+        'hist': create_confidence_histogram(data),
+        'timeline': create_timeline_chart(data),
+    }
+
+@st.cache_data(ttl=3600, max_entries=32, hash_funcs=_DF_HASH)
+def _create_timeline_chart_cached(data: pd.DataFrame) -> str:
+    data = _downsample_timeline(data)
+
+    # One WebGL trace per activity, with the y-axis as int16 category
+    # codes plus a small tick map: per-point label strings never leave
+    # the server, only a 2-byte code per row. Unused categories are
+    # pruned so an already-categorical column doesn't spill its full
+    # label vocabulary into empty traces, legend entries and ticks
+    categories = pd.Categorical(data['predicted_activity']).remove_unused_categories()
+    labels = [str(label) for label in categories.categories]
+    codes = categories.codes.astype(np.int16)
+
     fig = go.Figure()
-    fig.add_trace(go.Scatter(
-        x=data['datetime'],
-        y=data['predicted_activity'],
-        mode='markers+text',
-        text=data['predicted_activity'],
-        textposition="top center",
-        marker=dict(size=10)
-    ))
+    for code, activity in enumerate(labels):
+        mask = codes == code
+        fig.add_trace(go.Scattergl(
+            # Explicit datetime64 buffer: Plotly serializes the
+            # contiguous array on its C path instead of falling back to
+            # per-Timestamp Python objects
+            x=data['datetime'].to_numpy(dtype='datetime64[ns]')[mask],
+            y=codes[mask],
+            mode='markers',
+            name=activity,
+            hoverinfo='x+name',
+            marker=dict(size=8)
+        ))
     fig.update_layout(
         title="Activity Timeline",
         xaxis_title="Date/Time",
         yaxis_title="Activity",
-        showlegend=False
+        yaxis=dict(
+            tickmode='array',
+            tickvals=list(range(len(labels))),
+            ticktext=labels
+        ),
+        showlegend=True
     )
-    return fig
\ No newline at end of file
+    return _fig_to_json(fig)
@@ -1,7 +1,16 @@
 # streamlit_app/components/widgets.py
+import io
+
 import streamlit as st
 import pandas as pd
 
+from src.utils.helpers import hash_dataframe
+
+try:
+    import pyarrow as pa  # optional: hand st.dataframe a ready Arrow table
+except ImportError:
+    pa = None
+
 def display_metrics(metrics: dict[str, float], title: str = "Metrics") -> None:
     """
     Display metrics in a formatted layout
@@ -11,23 +20,99 @@ def display_metrics(metrics: dict[str, float], title: str = "Metrics") -> None:
         title: Title for the metrics section
     """
     st.subheader(title)
-    cols = st.columns(len(metrics), gap="medium")
-    for i, (metric_name, value) in enumerate(metrics.items()):
-        with cols[i]:
-            st.markdown(f"""
-            <div class="metric-container">
-                <h2>{value:.2f}</h2>
-                <p>{metric_name}</p>
-            </div>
-            """, unsafe_allow_html=True)
+    # One grid element for all cards instead of a markdown call per column
+    st.markdown(
+        f'<div style="display:grid;grid-template-columns:repeat({len(metrics)},1fr);gap:1rem">'
+        + ''.join(
+            f'<div class="metric-container"><h2>{value:.2f}</h2><p>{metric_name}</p></div>'
+            for metric_name, value in metrics.items())
+        + '</div>',
+        unsafe_allow_html=True
+    )
+
+# Bounds on what the preview ships through the Arrow serializer
+_PREVIEW_MAX_COLUMNS = 20
+_PREVIEW_MAX_CHARS = 120
+
+@st.cache_data(hash_funcs={
+    pd.DataFrame: lambda df: (df.shape, hash_dataframe(df.head()))
+})
+def _build_preview(df: pd.DataFrame):
+    """Head slice pruned for display: Arrow IPC size dominates
+    st.dataframe cost, so wide frames are cut to the first columns and
+    long text cells truncated before serialization.
+
+    Returns a pyarrow Table when pyarrow is available, so the cached
+    value is already Arrow and st.dataframe skips the pandas-to-Arrow
+    conversion on every rerun; otherwise the pruned DataFrame.
+    """
+    preview = df.head()
+    if preview.shape[1] > _PREVIEW_MAX_COLUMNS:
+        preview = preview.iloc[:, :_PREVIEW_MAX_COLUMNS]
+    for column in preview.columns[preview.dtypes == object]:
+        preview[column] = preview[column].astype('string').str.slice(0, _PREVIEW_MAX_CHARS)
+    if pa is not None:
+        return pa.Table.from_pandas(preview, preserve_index=False)
+    return preview
+
+def read_uploaded_csv(uploaded_file, max_rows: int = None) -> pd.DataFrame:
+    """Read an uploaded CSV on pyarrow, stopping early at max_rows
+
+    pyarrow's streaming reader parses batch by batch, so a row cap
+    terminates the parse instead of loading a huge file and discarding
+    the tail; the parse runs multithreaded and string columns arrive
+    Arrow-backed. Files pyarrow rejects (e.g. ragged rows the C engine
+    tolerates), or environments without pyarrow, fall back to
+    pd.read_csv, which at least honors nrows.
+    """
+    if pa is not None:
+        import pyarrow.csv as pacsv
+        try:
+            batches, rows = [], 0
+            with pacsv.open_csv(uploaded_file) as reader:
+                schema = reader.schema
+                for batch in reader:
+                    batches.append(batch)
+                    rows += batch.num_rows
+                    if max_rows is not None and rows >= max_rows:
+                        break
+            table = pa.Table.from_batches(batches, schema=schema)
+            if max_rows is not None:
+                table = table.slice(0, max_rows)
+            return table.to_pandas(types_mapper=pd.ArrowDtype)
+        except pa.ArrowInvalid:
+            uploaded_file.seek(0)
+    return pd.read_csv(uploaded_file, nrows=max_rows)
+
+@st.cache_data(hash_funcs={pd.DataFrame: hash_dataframe})
+def df_to_csv_bytes(df: pd.DataFrame) -> bytes:
+    """CSV bytes for st.download_button, cached on the frame
+
+    Reruns with unchanged data reuse the serialized payload instead of
+    re-running to_csv, and handing bytes (not str) to download_button
+    skips Streamlit's re-encode. When pyarrow is available its csv
+    writer does the serialization, which is markedly faster than
+    DataFrame.to_csv on large frames.
+    """
+    if pa is not None:
+        import pyarrow.csv as pacsv
+        try:
+            buf = io.BytesIO()
+            pacsv.write_csv(pa.Table.from_pandas(df, preserve_index=False), buf)
+            return buf.getvalue()
+        except (pa.ArrowInvalid, pa.ArrowNotImplementedError):
+            # Columns Arrow can't express as CSV cells (e.g. nested
+            # dicts) fall through to pandas, which stringifies them
+            pass
+    return df.to_csv(index=False).encode('utf-8')
 
 def display_data_preview(df: pd.DataFrame, title: str = "Data Preview") -> None:
     """
     Display a preview of the DataFrame
-    
+
     Args:
         df: Input DataFrame
         title: Title for the preview section
     """
     st.subheader(title)
-    st.dataframe(df.head(), use_container_width=True, height=300)
\ No newline at end of file
+    st.dataframe(_build_preview(df), use_container_width=True, height=300)
\ No newline at end of file
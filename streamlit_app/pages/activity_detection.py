@@ -1,29 +1,115 @@
 import streamlit as st
+import numpy as np
 import pandas as pd
-import plotly.express as px
-import plotly.graph_objects as go
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime
+import io
 import sys
 import os
 import json
 
-# Add the src directory to the Python path
-sys.path.append(os.path.join(os.path.dirname(__file__), '../..'))
+# Fallback for running straight from a checkout without
+# `pip install -e .`; guarded so reruns never grow sys.path
+_PROJECT_ROOT = os.path.abspath(os.path.join(os.path.dirname(__file__), '../..'))
+if _PROJECT_ROOT not in sys.path:
+    sys.path.insert(0, _PROJECT_ROOT)
 
+from streamlit_app.components.widgets import df_to_csv_bytes, read_uploaded_csv
 from src.models.activity_classifier import ActivityClassifier
-from config.settings import ACTIVITY_LABELS
+from config.settings import ACTIVITY_LABELS, BATCH_SIZE
+
+# plotly (and the visualizer module that pulls it in) imports inside
+# the functions that render figures: cold starts that never reach a
+# chart skip the several-hundred-ms plotly import entirely, and
+# sys.modules makes every later import a dict lookup
+
+@st.cache_resource
+def _get_classifier() -> ActivityClassifier:
+    """Process-wide classifier instance shared by the cached wrapper"""
+    return ActivityClassifier()
+
+@st.cache_resource
+def _get_pool() -> ThreadPoolExecutor:
+    """Persistent worker pool for batch classification
+
+    Living in cache_resource, the pool outlives individual reruns, so
+    batch submissions skip thread startup and the Streamlit script
+    thread stays free to update progress while chunks are in flight.
+    """
+    return ThreadPoolExecutor(max_workers=4)
+
+def _classify_batch_with_progress(texts: list, category: str) -> list:
+    """Classify texts in BATCH_SIZE chunks on the shared pool
+
+    All chunks are submitted up front so their network round-trips
+    overlap; collecting futures in submission order keeps results
+    aligned with the inputs while a progress bar advances per finished
+    chunk.
+
+    Inputs are deduplicated first — uploads full of templated messages
+    (auto-replies, reposts) classify each distinct text once, with the
+    results scattered back over the duplicates.
+    """
+    classifier = _get_classifier()
+    unique, inverse = np.unique(np.asarray(texts, dtype=object), return_inverse=True)
+    unique_texts = unique.tolist()
+    chunks = [unique_texts[i:i + BATCH_SIZE]
+              for i in range(0, len(unique_texts), BATCH_SIZE)]
+    futures = [_get_pool().submit(classifier.classify_batch, chunk, category)
+               for chunk in chunks]
+    progress = st.progress(0.0)
+    unique_results = []
+    for done, future in enumerate(futures, 1):
+        unique_results.extend(future.result())
+        progress.progress(done / len(futures))
+    progress.empty()
+    return [unique_results[i] for i in inverse]
+
+@st.cache_data(ttl=3600, max_entries=10000, show_spinner=False)
+def _classify_cached(text: str, category: str) -> dict:
+    """Classify one text, memoized on the (stripped text, category) pair
+
+    Repeat submissions of the same text — the quick-example picker is
+    the common case — come back from the cache instead of a fresh API
+    round-trip. The confidence threshold is deliberately not part of
+    the key: it is applied by the caller at display time, so moving the
+    slider never invalidates entries.
+    """
+    return _get_classifier().classify_single_text(text, category)
+
+def _empty_history() -> dict:
+    """Fresh history store: parallel lists, one per column
+
+    Column-per-field lists hand pd.DataFrame ready columns, so building
+    the history view is an O(columns) wrap instead of a per-entry dict
+    comprehension over the whole log on every rerun.
+    """
+    return {
+        'timestamp': [],
+        'text': [],
+        'category': [],
+        'predicted_activity': [],
+        'confidence': [],
+        'high_confidence': [],
+    }
+
+def _append_history(text: str, category: str, result: dict) -> None:
+    """Record one successful classification in the session history"""
+    history = st.session_state.classification_history
+    history['timestamp'].append(datetime.now())
+    history['text'].append(text)
+    history['category'].append(category)
+    history['predicted_activity'].append(result.get('predicted_activity', 'Unknown'))
+    history['confidence'].append(result.get('confidence', 0))
+    history['high_confidence'].append(result.get('high_confidence', False))
 
 def show_activity_detection():
     st.title("📧📱 Real-Time Activity Detection")
     st.markdown("Enter text to classify activities using AI models via Hugging Face APIs.")
     
-    # Initialize classifier
-    if 'classifier' not in st.session_state:
-        st.session_state.classifier = ActivityClassifier()
-    
     # Initialize history
     if 'classification_history' not in st.session_state:
-        st.session_state.classification_history = []
+        st.session_state.classification_history = _empty_history()
     
     # Sidebar options
     st.sidebar.subheader("⚙️ Settings")
@@ -63,39 +149,55 @@ def show_activity_detection():
     with tab3:
         show_analysis_history()
 
+# Row cap for batch CSV uploads; anything beyond this would swamp the
+# classification step anyway
+_MAX_UPLOAD_ROWS = 10000
+
+# Sample texts for quick testing
+_EXAMPLE_TEXTS = [
+    "Meeting with the team at 2 PM",
+    "Going for a run in the park",
+    "Cooking dinner for the family",
+    "Watching Netflix after work",
+    "Shopping for groceries",
+    "Video call with friends"
+]
+
+def _apply_example() -> None:
+    """Copy a picked example into the text area, once
+
+    Seeding through session_state on the change event leaves the text
+    area free for the user to edit or replace afterwards, instead of
+    the selectbox overriding their input on every rerun.
+    """
+    if st.session_state.example_choice:
+        st.session_state.single_text_input = st.session_state.example_choice
+
 def show_single_text_classification(category, confidence_threshold):
     st.subheader("🎯 Single Text Classification")
-    
-    # Sample texts for quick testing
+
     col1, col2 = st.columns([3, 1])
-    
+
     with col1:
         user_input = st.text_area(
             "Enter your text here:",
             height=100,
+            key="single_text_input",
             placeholder="Example: Just finished my morning workout at the gym. Time for a protein shake!"
         )
-    
+
     with col2:
         st.markdown("**Quick Examples:**")
-        example_texts = [
-            "Meeting with the team at 2 PM",
-            "Going for a run in the park",
-            "Cooking dinner for the family",
-            "Watching Netflix after work",
-            "Shopping for groceries",
-            "Video call with friends"
-        ]
-        
-        for i, example in enumerate(example_texts):
-            if st.button(f"📝 Example {i+1}", key=f"example_{i}"):
-                st.session_state.example_text = example
-    
-    # Use example text if selected
-    if 'example_text' in st.session_state:
-        user_input = st.session_state.example_text
-        del st.session_state.example_text
-    
+        # One selectbox instead of six buttons: a single widget to
+        # track per rerun, seeding the text area on change only
+        st.selectbox(
+            "Quick Examples:",
+            [""] + _EXAMPLE_TEXTS,
+            key="example_choice",
+            on_change=_apply_example,
+            label_visibility="collapsed"
+        )
+
     # Classification button
     col1, col2, col3 = st.columns([1, 1, 2])
     
@@ -105,18 +207,12 @@ def show_single_text_classification(category, confidence_threshold):
     if classify_button and user_input.strip():
         with st.spinner("🤖 Analyzing with AI..."):
             try:
-                result = st.session_state.classifier.classify_single_text(user_input, category)
+                result = _classify_cached(user_input.strip(), category)
                 
                 if 'error' not in result:
                     # Add to history
-                    history_entry = {
-                        'timestamp': datetime.now(),
-                        'text': user_input,
-                        'category': category,
-                        'result': result
-                    }
-                    st.session_state.classification_history.append(history_entry)
-                    
+                    _append_history(user_input, category, result)
+
                     # Display results
                     display_classification_result(result, confidence_threshold)
                 else:
@@ -162,11 +258,19 @@ def show_batch_processing(category, confidence_threshold):
         if uploaded_file is not None:
             try:
                 if uploaded_file.name.endswith('.txt'):
-                    content = str(uploaded_file.read(), "utf-8")
-                    texts_to_process = [line.strip() for line in content.split('\n') if line.strip()]
+                    # Decode and split incrementally instead of holding
+                    # the full file as one string plus a list of every
+                    # line: peak memory stays one buffered line
+                    lines = io.TextIOWrapper(uploaded_file, encoding='utf-8')
+                    texts_to_process = [line.strip() for line in lines if line.strip()]
                 
                 elif uploaded_file.name.endswith('.csv'):
-                    df = pd.read_csv(uploaded_file)
+                    # Capped streaming read: classification is the
+                    # bottleneck, so parsing past what a batch run can
+                    # reasonably process is pure waste
+                    df = read_uploaded_csv(uploaded_file, _MAX_UPLOAD_ROWS)
+                    if len(df) == _MAX_UPLOAD_ROWS:
+                        st.info(f"ℹ️ Loaded the first {_MAX_UPLOAD_ROWS:,} rows.")
                     if 'text' in df.columns:
                         texts_to_process = df['text'].dropna().tolist()
                     else:
@@ -192,18 +296,12 @@ def show_batch_processing(category, confidence_threshold):
         if st.button("🚀 Process All Texts", type="primary"):
             with st.spinner(f"🤖 Processing {len(texts_to_process)} texts..."):
                 try:
-                    results = st.session_state.classifier.classify_batch(texts_to_process, category)
+                    results = _classify_batch_with_progress(texts_to_process, category)
                     
                     # Add to history
                     for i, result in enumerate(results):
                         if 'error' not in result:
-                            history_entry = {
-                                'timestamp': datetime.now(),
-                                'text': texts_to_process[i],
-                                'category': category,
-                                'result': result
-                            }
-                            st.session_state.classification_history.append(history_entry)
+                            _append_history(texts_to_process[i], category, result)
                     
                     # Display batch results
                     display_batch_results(results, texts_to_process, confidence_threshold)
@@ -213,39 +311,39 @@ def show_batch_processing(category, confidence_threshold):
 
 def show_analysis_history():
     st.subheader("📊 Analysis History")
-    
-    if not st.session_state.classification_history:
+
+    history = st.session_state.classification_history
+    if not history['timestamp']:
         st.info("📝 No classifications yet. Start by classifying some text!")
         return
-    
+
     # History controls
     col1, col2, col3 = st.columns([1, 1, 2])
-    
+
     with col1:
         if st.button("🗑️ Clear History"):
-            st.session_state.classification_history = []
+            st.session_state.classification_history = _empty_history()
             st.success("✅ History cleared!")
             st.rerun()
-    
+
     with col2:
         if st.button("📥 Download History"):
             download_history()
-    
+
     # Statistics
     st.subheader("📈 Statistics")
-    
-    history_df = pd.DataFrame([
-        {
-            'timestamp': entry['timestamp'],
-            'text': entry['text'][:50] + "..." if len(entry['text']) > 50 else entry['text'],
-            'category': entry['category'],
-            'predicted_activity': entry['result'].get('predicted_activity', 'Unknown'),
-            'confidence': entry['result'].get('confidence', 0)
-        }
-        for entry in st.session_state.classification_history
-        if 'error' not in entry['result']
-    ])
-    
+
+    # The parallel lists become columns directly; only the display
+    # truncation needs a pass, and that runs vectorized
+    history_df = pd.DataFrame(history)
+    # Small fixed vocabularies: categorical codes make the stats'
+    # nunique/isin passes integer comparisons instead of string hashing
+    history_df['predicted_activity'] = history_df['predicted_activity'].astype('category')
+    history_df['category'] = history_df['category'].astype('category')
+    texts = history_df['text'].astype('string')
+    history_df['text'] = texts.str.slice(0, 50).where(
+        texts.str.len() <= 50, texts.str.slice(0, 50) + "...")
+
     if not history_df.empty:
         # Quick stats
         col1, col2, col3, col4 = st.columns(4)
@@ -265,54 +363,68 @@ def show_analysis_history():
             unique_activities = history_df['predicted_activity'].nunique()
             st.metric("Unique Activities", unique_activities)
         
-        # Activity distribution chart
+        # Distribution charts, served from the visualizer's figure
+        # cache: reruns with an unchanged history (tab switches, widget
+        # interactions elsewhere) replay pre-serialized JSON instead of
+        # rebuilding both figures. Each helper is keyed on just the
+        # column it plots, so unrelated history columns don't
+        # invalidate it.
+        from src.utils.visualizer import (
+            create_activity_pie_chart, create_confidence_histogram, render_cached)
+
         st.subheader("🎯 Activity Distribution")
-        activity_counts = history_df['predicted_activity'].value_counts()
-        
-        fig = px.pie(
-            values=activity_counts.values,
-            names=activity_counts.index,
-            title="Distribution of Predicted Activities"
-        )
-        st.plotly_chart(fig, use_container_width=True)
-        
-        # Confidence distribution
+        render_cached(create_activity_pie_chart(history_df[['predicted_activity']]))
+
         st.subheader("📊 Confidence Distribution")
-        fig = px.histogram(
-            history_df,
-            x='confidence',
-            nbins=20,
-            title="Distribution of Classification Confidence Scores"
-        )
-        st.plotly_chart(fig, use_container_width=True)
+        render_cached(create_confidence_histogram(history_df[['confidence']]))
         
         # Recent classifications table
         st.subheader("🕐 Recent Classifications")
-        recent_df = history_df.sort_values('timestamp', ascending=False).head(10)
+        # Entries are appended chronologically, so the newest ten are a
+        # tail slice reversed — no full sort per rerun
+        recent_df = history_df.iloc[-10:][::-1]
         st.dataframe(recent_df, use_container_width=True)
 
+# Gauge scaffolding shared by every classification render: only the
+# needle value and the threshold line change per call, so the nested
+# step/axis dicts are built once at import instead of per figure
+_GAUGE_BASE = {
+    'axis': {'range': [None, 100]},
+    'bar': {'color': "darkblue"},
+    'steps': [
+        {'range': [0, 50], 'color': "lightgray"},
+        {'range': [50, 80], 'color': "yellow"},
+        {'range': [80, 100], 'color': "green"}
+    ],
+}
+
+# Confidence buckets, highest cutoff first; the final cutoff is below
+# any valid score so the lookup always resolves
+_CONFIDENCE_BUCKETS = (
+    (0.8, "🟢", "High"),
+    (0.5, "🟡", "Medium"),
+    (-1.0, "🔴", "Low"),
+)
+
 def display_classification_result(result, confidence_threshold):
     """Display the results of a single classification"""
+    import plotly.express as px
+    import plotly.graph_objects as go
+
     st.success("✅ Classification Complete!")
-    
+
     # Main result
     col1, col2 = st.columns([2, 1])
-    
+
     with col1:
         confidence = result['confidence']
         activity = result['predicted_activity']
-        
+
         # Confidence indicator
-        if confidence > 0.8:
-            confidence_color = "🟢"
-            confidence_text = "High"
-        elif confidence > 0.5:
-            confidence_color = "🟡"
-            confidence_text = "Medium"
-        else:
-            confidence_color = "🔴"
-            confidence_text = "Low"
-        
+        confidence_color, confidence_text = next(
+            (color, text) for cutoff, color, text in _CONFIDENCE_BUCKETS
+            if confidence > cutoff)
+
         st.markdown(f"""
         ### 🎯 **{activity}**
         {confidence_color} **Confidence:** {confidence:.2%} ({confidence_text})
@@ -326,13 +438,7 @@ def display_classification_result(result, confidence_threshold):
             domain = {'x': [0, 1], 'y': [0, 1]},
             title = {'text': "Confidence"},
             gauge = {
-                'axis': {'range': [None, 100]},
-                'bar': {'color': "darkblue"},
-                'steps': [
-                    {'range': [0, 50], 'color': "lightgray"},
-                    {'range': [50, 80], 'color': "yellow"},
-                    {'range': [80, 100], 'color': "green"}
-                ],
+                **_GAUGE_BASE,
                 'threshold': {
                     'line': {'color': "red", 'width': 4},
                     'thickness': 0.75,
@@ -383,6 +489,8 @@ def display_classification_result(result, confidence_threshold):
 
 def display_batch_results(results, texts, confidence_threshold):
     """Display results from batch processing"""
+    import plotly.express as px
+
     st.success(f"✅ Processed {len(results)} texts!")
     
     # Summary statistics
@@ -406,18 +514,26 @@ def display_batch_results(results, texts, confidence_threshold):
             st.metric("Avg Confidence", f"{avg_conf:.2%}")
     
     if successful_results:
-        # Create results dataframe
-        results_df = pd.DataFrame([
-            {
-                'Text': texts[i][:50] + "..." if len(texts[i]) > 50 else texts[i],
-                'Full_Text': texts[i],
-                'Predicted_Activity': result['predicted_activity'],
-                'Confidence': result['confidence'],
-                'High_Confidence': result['confidence'] > confidence_threshold
-            }
-            for i, result in enumerate(results)
-            if 'error' not in result
-        ])
+        # Create results dataframe from preallocated column buffers
+        # (np.fromiter with a known count, float32 confidences), so
+        # construction is one allocation per column; truncation and the
+        # threshold comparison then run vectorized instead of per row
+        n = len(successful_results)
+        results_df = pd.DataFrame({
+            'Full_Text': np.fromiter(
+                (texts[i] for i, result in enumerate(results) if 'error' not in result),
+                dtype=object, count=n),
+            'Predicted_Activity': pd.Categorical(np.fromiter(
+                (r['predicted_activity'] for r in successful_results),
+                dtype=object, count=n)),
+            'Confidence': np.fromiter(
+                (r['confidence'] for r in successful_results),
+                dtype=np.float32, count=n),
+        })
+        full_texts = results_df['Full_Text'].astype('string')
+        results_df.insert(0, 'Text', full_texts.str.slice(0, 50).where(
+            full_texts.str.len() <= 50, full_texts.str.slice(0, 50) + "..."))
+        results_df['High_Confidence'] = results_df['Confidence'].gt(confidence_threshold)
         
         # Activity distribution
         st.subheader("📊 Activity Distribution")
@@ -452,15 +568,18 @@ def display_batch_results(results, texts, confidence_threshold):
             show_only_high_conf = st.checkbox("Show only high confidence results")
         
         with col2:
+            # One unique() pass serves both the options and the default
+            unique_activities = results_df['Predicted_Activity'].unique()
             selected_activities = st.multiselect(
                 "Filter by activity:",
-                options=results_df['Predicted_Activity'].unique(),
-                default=results_df['Predicted_Activity'].unique()
+                options=unique_activities,
+                default=unique_activities
             )
-        
-        # Apply filters
-        filtered_df = results_df.copy()
-        
+
+        # Apply filters; boolean indexing already returns new frames,
+        # so no defensive copy of the full results is needed
+        filtered_df = results_df
+
         if show_only_high_conf:
             filtered_df = filtered_df[filtered_df['High_Confidence']]
         
@@ -475,10 +594,9 @@ def display_batch_results(results, texts, confidence_threshold):
         
         # Download option
         if st.button("📥 Download Results as CSV"):
-            csv = results_df.to_csv(index=False)
             st.download_button(
                 label="Download CSV",
-                data=csv,
+                data=df_to_csv_bytes(results_df),
                 file_name=f"activity_classification_results_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv"
             )
@@ -492,32 +610,19 @@ def display_batch_results(results, texts, confidence_threshold):
 
 def download_history():
     """Prepare history data for download"""
-    if not st.session_state.classification_history:
+    history = st.session_state.classification_history
+    if not history['timestamp']:
         st.warning("No history to download")
         return
-    
-    # Prepare data for download
-    download_data = []
-    for entry in st.session_state.classification_history:
-        if 'error' not in entry['result']:
-            download_data.append({
-                'timestamp': entry['timestamp'].isoformat(),
-                'text': entry['text'],
-                'category': entry['category'],
-                'predicted_activity': entry['result']['predicted_activity'],
-                'confidence': entry['result']['confidence'],
-                'high_confidence': entry['result']['high_confidence']
-            })
-    
-    if download_data:
-        df = pd.DataFrame(download_data)
-        csv = df.to_csv(index=False)
-        
-        st.download_button(
-            label="📥 Download History CSV",
-            data=csv,
-            file_name=f"activity_detection_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
-            mime="text/csv"
-        )
-    else:
-        st.warning("No successful classifications to download")
\ No newline at end of file
+
+    # Failed classifications never reach the history, so the columns go
+    # straight into the frame; only the timestamps need formatting
+    df = pd.DataFrame(history)
+    df['timestamp'] = [ts.isoformat() for ts in history['timestamp']]
+
+    st.download_button(
+        label="📥 Download History CSV",
+        data=df_to_csv_bytes(df),
+        file_name=f"activity_detection_history_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
+        mime="text/csv"
+    )
\ No newline at end of file
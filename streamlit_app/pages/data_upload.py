@@ -2,31 +2,50 @@ import streamlit as st
 import pandas as pd
 from datetime import datetime
 import os
+from streamlit_app.components.widgets import df_to_csv_bytes, read_uploaded_csv
 from src.data.preprocessor import DataPreprocessor
 from src.utils.helpers import validate_data
 
+# One preprocessor for the whole process rather than one per browser
+# session: it carries no per-user state, only compiled patterns
+@st.cache_resource
+def _get_preprocessor() -> DataPreprocessor:
+    return DataPreprocessor()
+
 def show_data_upload():
     st.title("📁 Data Upload")
     st.markdown("Upload your email or social media data for in-depth analysis.")
     
-    # Initialize preprocessor
-    if 'preprocessor' not in st.session_state:
-        st.session_state.preprocessor = DataPreprocessor()
-    
+    # Row cap so a huge export doesn't get parsed end to end before the
+    # user decides whether they even want all of it
+    max_rows = int(st.sidebar.number_input(
+        "Max rows to load",
+        min_value=100,
+        value=10000,
+        step=1000,
+        help="Parsing stops after this many rows; raise it to load more"
+    ))
+
     # File upload
     uploaded_file = st.file_uploader(
         "Upload CSV or JSON file",
         type=['csv', 'json'],
         help="Upload a file containing text and timestamp data"
     )
-    
+
     if uploaded_file is not None:
         try:
             if uploaded_file.name.endswith('.csv'):
-                df = pd.read_csv(uploaded_file)
+                df = read_uploaded_csv(uploaded_file, max_rows)
             elif uploaded_file.name.endswith('.json'):
-                df = pd.read_json(uploaded_file)
-            
+                # read_json has no early termination for array-shaped
+                # documents; cap after the parse instead
+                df = pd.read_json(uploaded_file).head(max_rows)
+
+            if len(df) == max_rows:
+                st.info(f"ℹ️ Showing the first {max_rows:,} rows; "
+                        "raise 'Max rows to load' in the sidebar for more.")
+
             # Validate data
             required_columns = ['text', 'timestamp']
             if not validate_data(df, required_columns):
@@ -35,7 +54,7 @@ def show_data_upload():
             
             # Preprocess data
             with st.spinner("🔄 Processing data..."):
-                processed_df = st.session_state.preprocessor.preprocess_dataframe(df)
+                processed_df = _get_preprocessor().preprocess_dataframe(df)
             
             # Display preview
             st.success("✅ Data uploaded and processed successfully!")
@@ -45,10 +64,9 @@ def show_data_upload():
             st.dataframe(processed_df.head(), use_container_width=True, height=300)
             
             # Download processed data
-            csv = processed_df.to_csv(index=False)
             st.download_button(
                 label="📥 Download Processed Data",
-                data=csv,
+                data=df_to_csv_bytes(processed_df),
                 file_name=f"processed_data_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
                 mime="text/csv",
                 type="primary"
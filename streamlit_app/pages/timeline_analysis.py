@@ -4,41 +4,70 @@ from datetime import datetime
 from src.models.activity_classifier import ActivityClassifier
 from src.models.timeline_builder import TimelineBuilder
 from src.data.pattern_analyzer import PatternAnalyzer
-from src.utils.visualizer import create_activity_pie_chart, create_confidence_histogram, create_timeline_chart
+from src.utils.helpers import hash_dataframe
+from src.utils.visualizer import get_figs, render_cached
+from streamlit_app.components.widgets import df_to_csv_bytes
+
+# Same cheap DataFrame fingerprint the visualizer uses for its caches;
+# tolerant of the dict-valued columns classification output carries
+_DF_HASH = {pd.DataFrame: hash_dataframe}
+
+# One instance of each pipeline component per process; the classifier
+# keeps its API response cache warm across sessions this way
+@st.cache_resource
+def _get_classifier() -> ActivityClassifier:
+    return ActivityClassifier()
+
+@st.cache_resource
+def _get_timeline_builder() -> TimelineBuilder:
+    return TimelineBuilder()
+
+@st.cache_resource
+def _get_pattern_analyzer() -> PatternAnalyzer:
+    return PatternAnalyzer()
+
+# Each pipeline stage caches on its input frame, so a rerun (widget
+# interaction, page revisit) replays the whole analysis from cache
+# instead of re-classifying every row
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH)
+def _classify(df: pd.DataFrame) -> pd.DataFrame:
+    return _get_classifier().classify_with_context(df)
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH)
+def _analyze_patterns(classified_df: pd.DataFrame):
+    analyzer = _get_pattern_analyzer()
+    patterns = analyzer.analyze_daily_routine(classified_df)
+    life_events = analyzer.detect_life_events(classified_df)
+    insights = analyzer.generate_insights(patterns, life_events)
+    return patterns, life_events, insights
+
+@st.cache_data(show_spinner=False, max_entries=4, hash_funcs=_DF_HASH)
+def _build_timeline(classified_df: pd.DataFrame) -> dict:
+    return _get_timeline_builder().build_activity_timeline(classified_df)
 
 def show_timeline_analysis():
     st.title("📅 Timeline Analysis")
     st.markdown("Explore patterns and visualize timelines from your activity data.")
-    
-    # Initialize components
-    if 'classifier' not in st.session_state:
-        st.session_state.classifier = ActivityClassifier()
-    if 'timeline_builder' not in st.session_state:
-        st.session_state.timeline_builder = TimelineBuilder()
-    if 'pattern_analyzer' not in st.session_state:
-        st.session_state.pattern_analyzer = PatternAnalyzer()
-    
+
     # Check for uploaded data
     if 'uploaded_data' not in st.session_state or st.session_state.uploaded_data.empty:
         st.warning("⚠️ Please upload data on the Data Upload page first.")
         return
-    
+
     df = st.session_state.uploaded_data
-    
+
     # Classify activities
     with st.spinner("🤖 Analyzing activities..."):
-        classified_df = st.session_state.classifier.classify_with_context(df)
-    
+        classified_df = _classify(df)
+
     # Analyze patterns
     with st.spinner("🔍 Detecting patterns..."):
-        patterns = st.session_state.pattern_analyzer.analyze_daily_routine(classified_df)
-        life_events = st.session_state.pattern_analyzer.detect_life_events(classified_df)
-        insights = st.session_state.pattern_analyzer.generate_insights(patterns, life_events)
-    
+        patterns, life_events, insights = _analyze_patterns(classified_df)
+
     # Build timeline
     with st.spinner("📅 Generating timeline..."):
-        timeline = st.session_state.timeline_builder.build_activity_timeline(classified_df)
-        visualizations = st.session_state.timeline_builder.create_visualization(timeline)
+        timeline = _build_timeline(classified_df)
+        visualizations = _get_timeline_builder().create_visualization(timeline)
     
     # Display results
     st.subheader("📊 Analysis Results", anchor=False)
@@ -80,20 +109,22 @@ def show_timeline_analysis():
     for viz_name, fig in visualizations.items():
         st.plotly_chart(fig, use_container_width=True)
     
-    # Additional charts
+    # Additional charts, all served from one cached bundle
     st.markdown("### 📊 Additional Charts")
+    figs = get_figs(classified_df)
     col1, col2 = st.columns(2, gap="medium")
     with col1:
-        st.plotly_chart(create_activity_pie_chart(classified_df), use_container_width=True)
+        render_cached(figs['pie'])
     with col2:
-        st.plotly_chart(create_confidence_histogram(classified_df), use_container_width=True)
+        render_cached(figs['hist'])
+    if st.button("Clear figure cache"):
+        get_figs.clear()
     
     # Download results
     st.markdown("### 📥 Download Results")
-    csv = classified_df.to_csv(index=False)
     st.download_button(
         label="Download Classified Data",
-        data=csv,
+        data=df_to_csv_bytes(classified_df),
         file_name=f"timeline_analysis_{datetime.now().strftime('%Y%m%d_%H%M%S')}.csv",
         mime="text/csv",
         type="primary"